@@ -9,6 +9,8 @@ def run_uvicorn():
     port = os.getenv("ONBOARD_PORT", "8000")
     proxy_headers = os.getenv("ONBOARD_PROXY_HEADERS")
     forwarded_allow_ips = os.getenv("ONBOARD_FORWARDED_ALLOW_IPS")
+    # Each worker opens its own database pool; see DatabaseConfig.
+    workers = os.getenv("ONBOARD_WORKERS", "2")
 
     command = [
         "uvicorn",
@@ -18,7 +20,7 @@ def run_uvicorn():
         "--port",
         port,
         "--workers",
-        "2",
+        workers,
     ]
 
     if forwarded_allow_ips is not None:
@@ -42,10 +44,55 @@ def run_migrate():
     subprocess.run(command)
 
 
+# Print where worker start-up time goes, per top-level package
+def run_startup_profile(limit=25):
+    command = [sys.executable, "-X", "importtime", "-c", "import app.index"]
+    stderr = subprocess.run(command, capture_output=True, text=True).stderr
+
+    packages = {}
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+        modules.append((int(cumulative_us), name))
+
+    if not modules:
+        # The import failed; show why.
+        print(stderr)
+        return
+
+    total = sum(packages.values())
+    print(f"Importing app.index took {total / 1000:.1f} ms\n")
+    print(f"{'package':<32} {'self ms':>9} {'share':>7}")
+    for package, self_us in sorted(packages.items(), key=lambda p: -p[1])[:limit]:
+        print(f"{package:<32} {self_us / 1000:>9.1f} {self_us / total:>7.1%}")
+    print(f"\n{'module':<48} {'cumulative ms':>14}")
+    for cumulative_us, name in sorted(modules, reverse=True)[:limit]:
+        print(f"{name:<48} {cumulative_us / 1000:>14.1f}")
+
+
+# Re-fetch the cached Bitwarden secrets
+def run_refresh_secrets():
+    command = [
+        sys.executable,
+        "-c",
+        "from app.util.settings import refresh_bitwarden_cache; refresh_bitwarden_cache()",
+    ]
+    subprocess.run(command)
+
+
 # Entry point
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "migrate":
         run_migrate()
+    elif len(sys.argv) > 1 and sys.argv[1] == "refresh-secrets":
+        run_refresh_secrets()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--startup-profile":
+        run_startup_profile()
     elif len(sys.argv) > 1 and sys.argv[1] == "dev":
         run_dev()
     else:
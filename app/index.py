@@ -4,6 +4,7 @@ import os
 import re
 import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from urllib.parse import urlparse
@@ -12,38 +13,50 @@ import requests
 
 # FastAPI
 from fastapi import Cookie, Depends, FastAPI, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from jose import JWTError, jwt
 from pydantic import BaseModel
-from requests_oauthlib import OAuth2Session
 from sqlalchemy.orm import selectinload
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Import data types
-from app.models.user import DiscordModel, UserModel, user_to_dict
+from app.models.user import DiscordModel, UserModel
 
 # Import routes
 from app.routes import admin, api, plinko, wallet
 
 # Import middleware
-from app.util.authentication import Authentication
+from app.util.authentication import (
+    Authentication,
+    AuthenticationError,
+    CurrentPayload,
+    CurrentUser,
+)
 
 # import db functions
-from app.util.database import get_session, get_user, get_user_discord, init_db
-from app.util.discord import Discord
+from app.util.database import (
+    DATABASE_URL,
+    get_session,
+    get_user,
+    get_user_discord,
+    init_db,
+)
+from app.util.discord import Discord, discord_http
 
 # Import error handling
 from app.util.errors import Errors
-from app.util.forms import Forms
-
-# Import the page rendering library
-from app.util.kennelish import Kennelish
+from app.util.forms import Forms, form_registry
 from app.util.plinko import Plinko
+from app.util.responses import ORJSONResponse
+from app.util.serializers import serialize
 
 # Import options
+from app.util.sessions import session_store
 from app.util.settings import Settings
 
 if Settings().telemetry.enable:
@@ -58,11 +71,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # In-memory dev databases are never migrated, so create the tables here.
+    if "sqlite:///:memory:" in DATABASE_URL:
+        await init_db()
+        logger.info("Tables created in SQLite in-memory database.")
+    form_registry.preload()
+    yield
+    await discord_http.aclose()
+
+
 # Initiate FastAPI.
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 templates = Jinja2Templates(directory="app/templates")
 app.mount("/static", StaticFiles(directory="./app/static"), name="static")
 
+
+@app.exception_handler(AuthenticationError)
+async def authentication_error(request: Request, exc: AuthenticationError):
+    # The auth dependencies raise with the redirect/error page to send.
+    return exc.response
+
+
 if Settings().telemetry.enable:
     sentry_sdk.init(
         dsn=Settings().telemetry.url,
@@ -91,11 +122,7 @@ async def index(request: Request, token: Optional[str] = Cookie(None)):
     try:
         if token is None:
             raise JWTError("Token is None")
-        payload = jwt.decode(
-            token,
-            Settings().jwt.secret.get_secret_value(),
-            algorithms=Settings().jwt.algorithm,
-        )
+        payload = await Authentication.load(token)
 
         if payload.get("waitlist") and payload.get("waitlist") > 0:
             return RedirectResponse("/profile/", status_code=status.HTTP_302_FOUND)
@@ -123,6 +150,8 @@ async def oauth_transformer(redir: str = "/join/2"):
     if hostname != "" and hostname != Settings().http.domain:
         redir = "/join/2"
 
+    from requests_oauthlib import OAuth2Session
+
     oauth = OAuth2Session(
         Settings().discord.client_id,
         redirect_uri=Settings().discord.redirect_base + "_redir",
@@ -152,7 +181,7 @@ async def oauth_transformer_new(
     code: str,
     redir: str = "/join/2",
     redir_endpoint: Optional[str] = Cookie(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     # Open redirect check
     if redir == "_redir":
@@ -172,25 +201,20 @@ async def oauth_transformer_new(
         )
 
     # Get data from Discord
-    oauth = OAuth2Session(
-        Settings().discord.client_id,
-        redirect_uri=Settings().discord.redirect_base + "_redir",
-        scope=Settings().discord.scope,
-    )
-
-    token = oauth.fetch_token(
-        "https://discord.com/api/oauth2/token",
-        client_id=Settings().discord.client_id,
-        client_secret=Settings().discord.secret.get_secret_value(),
-        code=code,
-    )
+    token = await Discord.exchange_code(code)
+    discordData = await Discord.get_current_user(token) if token else None
 
-    r = oauth.get("https://discord.com/api/users/@me")
-    discordData = r.json()
+    if discordData is None:
+        return Errors.generate(
+            request,
+            502,
+            "Could not log in with Discord",
+            essay="Discord did not accept the log-in. Please try again.",
+        )
 
     # Generate a new user ID or reuse an existing one.
     try:
-        user = get_user_discord(session, discordData["id"], use_selectinload=True)
+        user = await get_user_discord(session, discordData["id"], use_selectinload=True)
     except ValueError:
         user = None
     # TODO implament Onboard Federation
@@ -214,7 +238,7 @@ async def oauth_transformer_new(
                 + discord_id
             )
 
-            hackucf_data = requests.get(url, cookies=cookies)
+            hackucf_data = await run_in_threadpool(requests.get, url, cookies=cookies)
             if hackucf_data.status_code == 200:
                 hackucf_data = hackucf_data.json().get("data")
                 user.hackucf_id = uuid.UUID(hackucf_data.get("id"))
@@ -237,7 +261,7 @@ async def oauth_transformer_new(
 
         infra_email = ""
 
-        Discord().join_plinko_server(discord_id, token)
+        await Discord.join_plinko_server(discord_id, token)
         discord_data = {
             "email": discordData.get("email"),
             "mfa": discordData.get("mfa_enabled"),
@@ -252,23 +276,28 @@ async def oauth_transformer_new(
         discord_model = DiscordModel(**discord_data)
         user.discord = discord_model
         session.add(user)
-        session.commit()
-        session.refresh(user)
-
-    # Create JWT. This should be the only way to issue JWTs.
-    jwtData = {
-        "discord": token,
-        "name": discordData["username"],
-        "pfp": discordData.get("avatar"),
-        "id": str(user.id),
-        "sudo": user.sudo,
-        "issued": time.time(),
-    }
-    bearer = jwt.encode(
-        jwtData,
-        Settings().jwt.secret.get_secret_value(),
-        algorithm=Settings().jwt.algorithm,
-    )
+        await session.commit()
+
+    if Settings().jwt.server_sessions:
+        # Opaque session id; the Discord token stays in the sessions table.
+        bearer = await session_store.create(
+            session, user, discordData["username"], discordData.get("avatar"), token
+        )
+    else:
+        # Create JWT. This should be the only way to issue JWTs.
+        jwtData = {
+            "discord": token,
+            "name": discordData["username"],
+            "pfp": discordData.get("avatar"),
+            "id": str(user.id),
+            "sudo": user.sudo,
+            "issued": time.time(),
+        }
+        bearer = jwt.encode(
+            jwtData,
+            Settings().jwt.secret.get_secret_value(),
+            algorithm=Settings().jwt.algorithm,
+        )
     rr = RedirectResponse(redir, status_code=status.HTTP_302_FOUND)
     if user.sudo:
         max_age = Settings().jwt.lifetime_sudo
@@ -308,22 +337,18 @@ Renders the landing page for the sign-up flow.
 async def join(
     request: Request,
     token: Optional[str] = Cookie(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    signups, wl_status, group = Plinko.get_waitlist_status(session)
+    signups, wl_status, group = await Plinko.get_waitlist_status(session)
     if token is None:
         return templates.TemplateResponse(
             "signup.html", {"request": request, "waitlist_status": wl_status}
         )
     else:
         try:
-            payload = jwt.decode(
-                token,
-                Settings().jwt.secret.get_secret_value(),
-                algorithms=Settings().jwt.algorithm,
-            )
+            payload = await Authentication.load(token)
 
-            user_data = get_user(session, uuid.UUID(payload.get("id")))
+            user_data = await get_user(session, uuid.UUID(payload.get("id")))
 
             if user_data.waitlist and user_data.waitlist > 0:
                 return RedirectResponse("/profile", status_code=status.HTTP_302_FOUND)
@@ -340,23 +365,20 @@ Renders a basic "my membership" page
 
 
 @app.get("/profile/")
-@Authentication.member
 async def profile(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
+    user_data: CurrentUser,
+    session: AsyncSession = Depends(get_session),
 ):
-    # Get data from DynamoDB
-    user_data = get_user(session, uuid.UUID(payload.get("id")))
-
-    team_data = Plinko.get_team(session, payload.get("id"))
+    team_data = await Plinko.team_for(
+        session, user_data.team_number, user_data.assigned_run
+    )
 
     return templates.TemplateResponse(
         "profile.html",
         {
             "request": request,
-            "user_data": user_to_dict(user_data),
+            "user_data": serialize(user_data),
             "team_data": team_data,
         },
     )
@@ -368,26 +390,19 @@ Renders a Kennelish form page, complete with stylings and UI controls.
 
 
 @app.get("/join/{num}/")
-@Authentication.member
 async def forms(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
+    payload: CurrentPayload,
+    user_data: CurrentUser,
     num: str = "1",
-    session: Session = Depends(get_session),
 ):
     # AWS dependencies
 
     if num == "1":
         return RedirectResponse("/join/", status_code=status.HTTP_302_FOUND)
 
-    data = Forms.get_form_body(num)
-
-    # Get data from DynamoDB
-    user_data = get_user(session, uuid.UUID(payload.get("id")))
-
-    # Have Kennelish parse the data.
-    body = Kennelish.parse(data, user_to_dict(user_data))
+    # Render the (compiled, cached) Kennelish form.
+    body = Forms.get_render_plan(num).render(serialize(user_data))
 
     return templates.TemplateResponse(
         "form.html",
@@ -407,7 +422,13 @@ async def final(request: Request):
 
 
 @app.get("/logout")
-async def logout(request: Request):
+async def logout(
+    request: Request,
+    token: Optional[str] = Cookie(None),
+    session: AsyncSession = Depends(get_session),
+):
+    if token and session_store.is_session_id(token):
+        await session_store.revoke(session, token)
     rr = RedirectResponse("/", status_code=status.HTTP_302_FOUND)
     rr.delete_cookie(key="token")
     return rr
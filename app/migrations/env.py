@@ -5,6 +5,8 @@ from sqlalchemy import engine_from_config, pool
 from sqlalchemy.engine import Connection
 from sqlmodel import SQLModel  # noqa: F401
 
+from app.models.plinko import WaitlistCounterModel  # noqa: F401
+from app.models.session import SessionModel  # noqa: F401
 from app.models.user import DiscordModel, UserModel  # noqa: F401
 from app.util.settings import Settings
 
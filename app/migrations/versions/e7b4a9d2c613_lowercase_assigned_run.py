@@ -0,0 +1,34 @@
+"""Lowercase assigned_run
+
+Revision ID: e7b4a9d2c613
+Revises: c52e7a1f9d38
+Create Date: 2026-10-18 13:12:40.918204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b4a9d2c613"
+down_revision: Union[str, None] = "c52e7a1f9d38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Runs are stored lowercased from now on (see UserModelMutable), so
+    # roster queries can compare them with = and use their index.
+    op.execute(
+        sa.text(
+            "UPDATE usermodel SET assigned_run = lower(assigned_run) "
+            "WHERE assigned_run != lower(assigned_run)"
+        )
+    )
+
+
+def downgrade() -> None:
+    # The original capitalization is not kept; lowercase runs are still valid.
+    pass
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+# Single-row table. Updating the row is what serializes waitlist admissions
+# across workers: the first statement of every admission bumps `admissions`,
+# which holds the row (Postgres) or database (SQLite) write lock until commit.
+class WaitlistCounterModel(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    admissions: int = 0
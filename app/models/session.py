@@ -0,0 +1,18 @@
+import uuid
+from typing import Optional
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+
+# Server-side login session (jwt.server_sessions). The cookie only carries the
+# opaque id; the Discord OAuth token never leaves the server.
+class SessionModel(SQLModel, table=True):
+    id: str = Field(primary_key=True, max_length=64)
+    user_id: uuid.UUID = Field(foreign_key="usermodel.id", index=True)
+    name: Optional[str] = None
+    pfp: Optional[str] = None
+    sudo: Optional[bool] = False
+    discord_token: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    issued: float
+    expires: float
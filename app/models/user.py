@@ -2,7 +2,8 @@ import re
 import uuid
 from typing import Any, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, field_validator, validator
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -16,11 +17,20 @@ class DiscordModel(SQLModel, table=True):
     nitro: Optional[int] = None
     locale: Optional[str] = None
     username: str
-    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="usermodel.id")
+    user_id: Optional[uuid.UUID] = Field(
+        default=None, foreign_key="usermodel.id", index=True
+    )
     user: "UserModel" = Relationship(back_populates="discord")
 
 
 class UserModel(SQLModel, table=True):
+    # Roster lookups (Plinko.team_for, /plinko/bot) filter on all three.
+    __table_args__ = (
+        Index(
+            "ix_usermodel_run_team_waitlist", "assigned_run", "team_number", "waitlist"
+        ),
+    )
+
     # Identifiers
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
@@ -42,16 +52,16 @@ class UserModel(SQLModel, table=True):
     sudo: Optional[bool] = False
 
     # Collected from Discord
-    discord_id: str
+    discord_id: str = Field(unique=True, index=True)
     discord: DiscordModel = Relationship(back_populates="user")
 
     # Collected from HackUCF Onboard
-    hackucf_id: Optional[uuid.UUID] = None
+    hackucf_id: Optional[uuid.UUID] = Field(default=None, index=True)
     hackucf_member: Optional[bool] = False
     experience: Optional[int] = None
 
     # HPCC data (internal)
-    waitlist: Optional[int] = None
+    waitlist: Optional[int] = Field(default=None, index=True)
     team_number: Optional[int] = None
     assigned_run: Optional[str] = ""
 
@@ -102,6 +112,12 @@ class UserModelMutable(BaseModel):
 
     did_get_shirt: Optional[bool] = None
 
+    @field_validator("assigned_run")
+    @classmethod
+    def normalize_run(cls, value):
+        # Runs are matched case-insensitively; store them one way.
+        return value.lower() if value else value
+
 
 class PublicContact(BaseModel):
     first_name: str
@@ -144,6 +160,26 @@ def user_update_instance(instance: SQLModel, data: dict[str, Any]) -> None:
                 setattr(instance, key, value)
 
 
+def user_update_changed(instance: SQLModel, data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Like user_update_instance(), but only assigns values that differ from the
+    instance's current ones, so the flush UPDATEs just those columns (or
+    nothing). Returns the changed values, nested like `data`.
+    """
+    changed = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            nested_instance = getattr(instance, key, None)
+            if nested_instance is not None:
+                nested = user_update_changed(nested_instance, value)
+                if nested:
+                    changed[key] = nested
+        elif value is not None and getattr(instance, key, None) != value:
+            setattr(instance, key, value)
+            changed[key] = value
+    return changed
+
+
 # Removed unneeded functionality
 
 # class CyberLabModel(SQLModel, table=True):
@@ -1,47 +1,81 @@
+import csv
+import io
 import logging
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Body, Cookie, Depends, Request, Response
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
 from jose import jwt
+from sqlalchemy import select as sa_select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.types import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.background import BackgroundTask
 
 from app.models.user import (
+    DiscordModel,
     UserModel,
     UserModelMutable,
     user_to_dict,
     user_update_instance,
 )
-from app.util.authentication import Authentication
-from app.util.database import get_session, get_user
+from app.util.authentication import AdminPayload, token_cache
+from app.util.database import get_session, get_user, open_session, pool_metrics
 from app.util.discord import Discord
 from app.util.email import Email
 from app.util.errors import Errors
+from app.util.plinko import roster_cache
+from app.util.responses import ORJSONResponse
+from app.util.serializers import get_serializer, serialize
+from app.util.sessions import session_store
 from app.util.settings import Settings
 
 logger = logging.getLogger(__name__)
 
 templates = Jinja2Templates(directory="app/templates")
 
-router = APIRouter(prefix="/admin", tags=["Admin"], responses=Errors.basic_http())
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    responses=Errors.basic_http(),
+    default_response_class=ORJSONResponse,
+)
+
+# Columns /admin/list can project with ?fields=.
+LIST_FIELDS = {
+    **{name: column for name, column in UserModel.__table__.columns.items()},
+    **{
+        f"discord.{name}": column
+        for name, column in DiscordModel.__table__.columns.items()
+    },
+}
+LIST_MAX_LIMIT = 1000
+
+CSV_DEFAULT_COLUMNS = [
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "shirt_size",
+    "discord.username",
+    "experience",
+    "waitlist",
+    "team_name",
+    "availability",
+    "team_number",
+    "assigned_run",
+]
+CSV_YIELD_PER = 500
 
 
 @router.get("/")
-@Authentication.admin
-async def admin(request: Request, token: Optional[str] = Cookie(None)):
+async def admin(request: Request, payload: AdminPayload):
     """
     Renders the Admin home page.
     """
-    if token is None:
-        return Errors.generate(request, 401, "User not authorized. Try logging in?")
-    payload = jwt.decode(
-        token,
-        Settings().jwt.secret.get_secret_value(),
-        algorithms=Settings().jwt.algorithm,
-    )
     return templates.TemplateResponse(
         "admin_searcher.html",
         {
@@ -54,12 +88,11 @@ async def admin(request: Request, token: Optional[str] = Cookie(None)):
 
 
 @router.get("/get/")
-@Authentication.admin
 async def admin_get_single(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     member_id: Optional[str] = "FAIL",
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     API endpoint that gets a specific user's data as JSON
@@ -72,21 +105,20 @@ async def admin_get_single(
         .where(UserModel.id == uuid.UUID(member_id))
         .options(selectinload(UserModel.discord))
     )
-    user_data = user_to_dict(session.exec(statement).one_or_none())
+    user_data = serialize((await session.exec(statement)).one_or_none())
 
     if not user_data:
         return Errors.generate(request, 404, "User Not Found")
 
-    return {"data": user_data}
+    return ORJSONResponse({"data": user_data})
 
 
 @router.get("/get_by_snowflake/")
-@Authentication.admin
 async def admin_get_snowflake(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     discord_id: Optional[str] = "FAIL",
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     API endpoint that gets a specific user's data as JSON, given a Discord snowflake.
@@ -100,7 +132,7 @@ async def admin_get_snowflake(
         .where(UserModel.discord_id == discord_id)
         .options(selectinload(UserModel.discord))
     )
-    data = user_to_dict(session.exec(statement).one_or_none())
+    data = serialize((await session.exec(statement)).one_or_none())
     # if not data:
     #    # Try a legacy-user-ID search (deprecated, but still neccesary)
     #    data = table.scan(FilterExpression=Attr("discord_id").eq(int(discord_id))).get(
@@ -112,17 +144,16 @@ async def admin_get_snowflake(
 
     # data = data[0]
 
-    return {"data": data}
+    return ORJSONResponse({"data": data})
 
 
 @router.post("/message/")
-@Authentication.admin
 async def admin_post_discord_message(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     member_id: Optional[str] = "FAIL",
     user_jwt: dict = Body(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     API endpoint that gets a specific user's data as JSON
@@ -130,8 +161,10 @@ async def admin_post_discord_message(
     if member_id == "FAIL":
         return {"data": {}, "error": "Missing ?member_id"}
 
-    data = session.exec(
-        select(UserModel).where(UserModel.id == uuid.UUID(member_id))
+    data = (
+        await session.exec(
+            select(UserModel).where(UserModel.id == uuid.UUID(member_id))
+        )
     ).one_or_none()
 
     if not data:
@@ -139,7 +172,7 @@ async def admin_post_discord_message(
 
     message_text = user_jwt.get("msg")
 
-    res = Discord.send_message(data.discord_id, message_text)
+    res = await Discord.send_message(data.discord_id, message_text)
 
     if res:
         return {"msg": "Message sent."}
@@ -148,12 +181,11 @@ async def admin_post_discord_message(
 
 
 @router.post("/get/")
-@Authentication.admin
 async def admin_edit(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     input_data: Optional[UserModelMutable] = {},
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     API endpoint that modifies a given user's data
@@ -163,66 +195,183 @@ async def admin_edit(
     member_id = uuid.UUID(input_data.id)
     filtered_data = {k: v for k, v in input_data.dict().items() if v is not None}
     logger.info(f"AUDIT: Editing user {member_id} with data {filtered_data}")
-    member_data = get_user(session, member_id, use_selectinload=True)
+    member_data = await get_user(session, member_id, use_selectinload=True)
 
     if not member_data:
         return Errors.generate(request, 404, "User Not Found")
+    old_run = member_data.assigned_run
     input_data = user_to_dict(input_data)
     input_data.pop("id")
     user_update_instance(member_data, input_data)
-    member_reutrn = user_to_dict(member_data)
+    member_reutrn = serialize(member_data)
     session.add(member_data)
-    session.commit()
+    await session.commit()
+    roster_cache.invalidate(old_run, member_data.assigned_run)
     return {"data": member_reutrn, "msg": "Updated successfully!"}
 
 
+@router.post("/revoke/")
+async def admin_revoke_sessions(
+    request: Request,
+    payload: AdminPayload,
+    member_id: Optional[str] = "FAIL",
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    API endpoint that logs a user out everywhere by revoking their
+    server-side sessions. JWT logins cannot be revoked and are unaffected.
+    """
+    if member_id == "FAIL":
+        return {"data": {}, "error": "Missing ?member_id"}
+
+    revoked = await session_store.revoke_user(session, uuid.UUID(member_id))
+    logger.info(f"AUDIT: Revoked {revoked} session(s) of user {member_id}")
+    return {"data": {"revoked": revoked}}
+
+
+@router.get("/metrics")
+async def admin_metrics(request: Request, payload: AdminPayload):
+    """
+    API endpoint that reports this worker's runtime counters.
+    """
+    return {
+        "data": {
+            "database": pool_metrics.snapshot(),
+            "roster_cache": roster_cache.snapshot(),
+            "token_cache": token_cache.snapshot(),
+            "session_cache": session_store.snapshot(),
+        }
+    }
+
+
 @router.get("/list")
-@Authentication.admin
 async def admin_list(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    session: Session = Depends(get_session),
+    payload: AdminPayload,
+    after: Optional[uuid.UUID] = None,
+    limit: int = 500,
+    fields: Optional[str] = None,
+    assigned_run: Optional[str] = None,
+    waitlist: Optional[int] = None,
+    checked_in: Optional[bool] = None,
+    team_number: Optional[int] = None,
+    session: AsyncSession = Depends(get_session),
 ):
     """
-    API endpoint that dumps all users as JSON.
+    API endpoint that pages through users as JSON, ordered by ID.
+
+    Pass the returned `next` cursor as ?after= to get the following page; it
+    is null on the last page. ?fields= takes a comma-separated list of user
+    columns and discord.<column> names to return instead of whole records.
     """
-    statement = select(UserModel).options(selectinload(UserModel.discord))
-    users = session.exec(statement)
+    limit = max(1, min(limit, LIST_MAX_LIMIT))
+
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in LIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        # The cursor column always comes back.
+        names = ["id"] + [field for field in requested if field != "id"]
+        # sqlalchemy's select() always yields rows, even for a single column.
+        statement = sa_select(*(LIST_FIELDS[name] for name in names))
+        if any(name.startswith("discord.") for name in names):
+            statement = statement.outerjoin(
+                DiscordModel, DiscordModel.user_id == UserModel.id
+            )
+    else:
+        names = None
+        statement = select(UserModel).options(selectinload(UserModel.discord))
+
+    filters = {
+        UserModel.assigned_run: roster_cache.key(assigned_run),
+        UserModel.waitlist: waitlist,
+        UserModel.checked_in: checked_in,
+        UserModel.team_number: team_number,
+    }
+    for column, value in filters.items():
+        if value is not None:
+            statement = statement.where(column == value)
+    if after is not None:
+        statement = statement.where(UserModel.id > after)
+    statement = statement.order_by(UserModel.id).limit(limit)
+
     data = []
-    for user in users:
-        user = user_to_dict(user)
+    serialize_user = get_serializer(UserModel)
+    for row in await session.exec(statement):
+        if names is None:
+            data.append(serialize_user(row))
+            continue
+        user = {}
+        for name, value in zip(names, row):
+            if name.startswith("discord."):
+                user.setdefault("discord", {})[name.split(".", 1)[1]] = value
+            else:
+                user[name] = value
         data.append(user)
 
-    return {"data": data}
+    next_cursor = data[-1]["id"] if len(data) == limit else None
+    return ORJSONResponse({"data": data, "next": next_cursor})
 
 
 @router.get("/csv")
-@Authentication.admin
 async def admin_list_csv(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    session: Session = Depends(get_session),
+    payload: AdminPayload,
+    columns: Optional[str] = None,
 ):
     """
-    API endpoint that dumps all users as CSV.
-    """
-    statement = select(UserModel).options(selectinload(UserModel.discord))
-    data = session.exec(statement)
-
-    output = "id, first_name, last_name, email, shirt_size, discord_username, experience, waitlist, comments, team_name, availability, team_number, assigned_run \n"
-    for user in data:
-        user = user_to_dict(user)
-        output += f'"{user.get("id")}", '
-        output += f'"{user.get("first_name")}", '
-        output += f'"{user.get("last_name")}", '
-        output += f'"{user.get("email")}", '
-        output += f'"{user.get("shirt_size")}", '
-        output += f'"{user.get("discord", {}).get("username")}", '
-        output += f'"{user.get("experience")}", '
-        output += f'"{user.get("waitlist")}", '
-        output += f'"{user.get("comments")}", '
-        output += f'"{user.get("team_name")}", '
-        output += f'"{user.get("availability")}", '
-        output += f'"{user.get("team_number")}", '
-        output += f'"{user.get("assigned_run")}" \n'
-    return Response(content=output, headers={"Content-Type": "text/csv"})
+    API endpoint that streams all users as CSV.
+
+    ?columns= takes a comma-separated list of user columns and
+    discord.<column> names; it defaults to CSV_DEFAULT_COLUMNS.
+    """
+    if columns:
+        names = [name.strip() for name in columns.split(",") if name.strip()]
+    else:
+        names = CSV_DEFAULT_COLUMNS
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown:
+        return Errors.generate(request, 400, f"Unknown columns: {', '.join(unknown)}")
+
+    statement = (
+        sa_select(*(LIST_FIELDS[name] for name in names))
+        # Explicit, in case only discord.* columns were asked for.
+        .select_from(UserModel)
+        .outerjoin(DiscordModel, DiscordModel.user_id == UserModel.id)
+        .order_by(UserModel.id)
+        .execution_options(yield_per=CSV_YIELD_PER)
+    )
+    header = [name.replace(".", "_") for name in names]
+
+    # The request's own session is closed once this handler returns, so the
+    # export reads through a session of its own. The query is started here,
+    # before the response is, so a failure is still a proper error response.
+    session = open_session()
+    try:
+        result = await session.stream(statement)
+    except Exception:
+        await session.close()
+        raise
+
+    async def generate():
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            yield buffer.getvalue()
+
+            async for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue()
+        finally:
+            await session.close()
+
+    # Also closes the session if the client went away before streaming began.
+    return StreamingResponse(
+        generate(), media_type="text/csv", background=BackgroundTask(session.close)
+    )
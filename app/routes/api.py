@@ -1,24 +1,31 @@
 import json
 import logging
-import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.info import InfoModel
-from app.models.user import PublicContact, UserModel, user_update_instance
-from app.util.authentication import Authentication
+from app.models.user import PublicContact, user_update_changed
+from app.util.authentication import CurrentUser
 from app.util.database import get_session
 from app.util.errors import Errors
 from app.util.forms import Forms, apply_fuzzy_parsing, transform_dict
-from app.util.kennelish import Transformer
+from app.util.kennelish import Kennelish
+from app.util.plinko import roster_cache
+from app.util.responses import ORJSONResponse
+from app.util.serializers import serialize
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api", tags=["API"], responses=Errors.basic_http())
+router = APIRouter(
+    prefix="/api",
+    tags=["API"],
+    responses=Errors.basic_http(),
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.get("/")
@@ -39,16 +46,67 @@ async def get_root():
     )
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+
 @router.get("/form/{num}")
-async def get_form(num: str):
+async def get_form(request: Request, num: str, v: Optional[str] = None):
     """
     Gets the JSON markup for a Kennelish file. For client-side rendering (if that ever becomes a thing).
     Note that Kennelish form files are NOT considered sensitive.
+
+    The ETag is the form's content hash. Requests pinned to that hash
+    (?v=, as returned by the prefill endpoint) may be cached forever; others
+    are revalidated, which costs a 304 while the form is unchanged.
     """
     try:
-        return Forms.get_form_body(num)
+        entry = Forms.get_entry(num)
     except FileNotFoundError:
-        return HTTPException(status_code=404, detail="Form not found")
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    if v == entry.digest:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "public, no-cache"
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.json, media_type="application/json", headers=headers)
+
+
+@router.get("/form/{num}/prefill")
+async def get_form_prefill(user: CurrentUser, num: str):
+    """
+    Gets the user's current values for the fields of a Kennelish form, as the
+    server-side renderer would prefill them, along with the form version they
+    belong to (usable as /api/form/{num}?v=).
+    """
+    try:
+        entry = Forms.get_entry(num)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    user_data = serialize(user)
+    data = {}
+    for key, inp_type in entry.prefill_fields:
+        try:
+            data[key] = Kennelish.prefill_value(inp_type, key, user_data)
+        except Exception:
+            # Rendered as invalid; nothing to prefill.
+            continue
+
+    return ORJSONResponse(
+        {"data": data, "version": entry.digest},
+        headers={"Cache-Control": "private, no-store"},
+    )
 
 
 """
@@ -125,59 +183,95 @@ Allows updating the user's database using a schema assumed by the Kennelish file
 #    return user.ethics_form.dict()
 #
 #
+def validate_page(num: str, inp: dict) -> dict:
+    """
+    Validates one page's submission against its form's (cached) generated
+    model and converts it to UserModel field values.
+    """
+    try:
+        model = Forms.get_validator(num)
+        validated_data = apply_fuzzy_parsing(model(**inp).model_dump())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Form not found")
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"form": num, "errors": [{"loc": [], "msg": str(e)}]},
+        )
+    except ValidationError as e:
+        # Names the page and fields, so the form can send the user back to them.
+        errors = e.errors(include_url=False, include_context=False, include_input=False)
+        raise HTTPException(status_code=422, detail={"form": num, "errors": errors})
+    return transform_dict(validated_data)
+
+
+async def save_changes(session: AsyncSession, user, changed: dict):
+    """
+    Commits the columns user_update_changed() touched, as a single UPDATE.
+    The session doesn't expire on commit, so `user` is current without a
+    refresh.
+    """
+    if not changed:
+        return
+    session.add(user)
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        logger.error(e)
+        await session.rollback()
+        raise HTTPException(
+            status_code=422, detail=("Integrity Error. " + str(e).split("\n")[0])
+        )
+    # Rosters show first names.
+    roster_cache.invalidate(user.assigned_run)
+
+
 @router.post("/form/{num}")
-@Authentication.member
 async def post_form(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
+    user: CurrentUser,
     num: str = "1",
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    # Get Kennelish data
-    try:
-        kennelish_data = Forms.get_form_body(num)
-    except FileNotFoundError:
-        return HTTPException(status_code=404, detail="Form not found")
-
-    model = Transformer.kennelish_to_pydantic(kennelish_data)
-
     # Parse and Validate inputs
     try:
         inp = await request.json()
     except json.JSONDecodeError:
         return {"description": "Malformed JSON input."}
 
-    model_validated = model(**inp).model_dump()
+    validated_data = validate_page(num, inp)
 
-    validated_data = apply_fuzzy_parsing(model_validated)
+    await save_changes(session, user, user_update_changed(user, validated_data))
 
-    # Transform the dictionary
-    validated_data = transform_dict(validated_data)
+    return user.model_dump()
 
-    statement = (
-        select(UserModel)
-        .where(UserModel.id == uuid.UUID(payload["id"]))
-        .options(selectinload(UserModel.discord))
-    )
-    result = session.exec(statement)
-    user = result.one_or_none()
 
-    if not user:
-        raise HTTPException(status_code=422, detail="User not found")
+@router.post("/forms")
+async def post_forms(
+    request: Request,
+    user: CurrentUser,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Submits several form pages at once, as {"<form>": {<page body>}, ...}.
+    Every page is validated before anything is written; pages are applied in
+    order, so later pages win, and only changed columns are updated. A page
+    that fails validation rejects the batch with a 422 naming that page.
+    """
+    try:
+        pages = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Malformed JSON input.")
+    if not isinstance(pages, dict) or not all(
+        isinstance(inp, dict) for inp in pages.values()
+    ):
+        raise HTTPException(status_code=400, detail="Malformed JSON input.")
 
-    user_update_instance(user, validated_data)
+    validated_pages = [validate_page(num, inp) for num, inp in pages.items()]
 
-    # Save the updated model back to the database
-    session.add(user)
-    try:
-        session.commit()
-    except IntegrityError as e:
-        logger.error(e)
-        session.rollback()
-        raise HTTPException(
-            status_code=422, detail=("Integrity Error. " + str(e).split("\n")[0])
-        )
-    session.refresh(user)
+    changed = {}
+    for validated_data in validated_pages:
+        changed.update(user_update_changed(user, validated_data))
+    await save_changes(session, user, changed)
 
     return user.model_dump()
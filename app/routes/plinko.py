@@ -5,7 +5,6 @@ from typing import Optional
 
 from fastapi import (
     APIRouter,
-    Cookie,
     Depends,
     Request,
     Response,
@@ -20,7 +19,8 @@ from jose import JWTError, jwt
 from pydantic import error_wrappers, validator
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.sqltypes import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.info import InfoModel
 from app.models.user import (
@@ -30,20 +30,26 @@ from app.models.user import (
     UserModelMutable,
     user_to_dict,
 )
-from app.util.authentication import Authentication
-from app.util.database import Session, get_session, get_user
+from app.util.authentication import AdminPayload, Authentication, CurrentUser
+from app.util.database import get_session, get_user
 from app.util.discord import Discord
 from app.util.errors import Errors
 from app.util.kennelish import Kennelish, Transformer
-from app.util.plinko import Plinko
-from app.util.settings import Settings
+from app.util.plinko import Plinko, roster_cache
+from app.util.responses import ORJSONResponse
+from app.util.settings import settings_snapshot
 from app.util.websockets import ConnectionManager
 
 logger = logging.getLogger(__name__)
 
 templates = Jinja2Templates(directory="app/templates")
 
-router = APIRouter(prefix="/plinko", tags=["HPCC"], responses=Errors.basic_http())
+router = APIRouter(
+    prefix="/plinko",
+    tags=["HPCC"],
+    responses=Errors.basic_http(),
+    default_response_class=ORJSONResponse,
+)
 
 wsm = ConnectionManager()
 
@@ -66,7 +72,7 @@ async def get_root():
 @router.websocket("/ws/{token}")
 async def plinko_ws(websocket: WebSocket, token: str):
     # Token validate
-    valid_token = Authentication.admin_validate(token)
+    valid_token = await Authentication.admin_validate(token)
     if not valid_token:
         wsm.disconnect(websocket)
 
@@ -81,63 +87,56 @@ async def plinko_ws(websocket: WebSocket, token: str):
 
 @router.get("/waitlist")
 async def get_waitlist(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
-    signups, waitlist_status, group = Plinko.get_waitlist_status(session)
+    signups, waitlist_status, group = await Plinko.get_waitlist_status(session)
 
     return {"signups": signups, "status": waitlist_status, "group": group}
 
 
 @router.get("/drop-out")
-@Authentication.member
 async def drop_out(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
+    user_data: CurrentUser,
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Quit HPCC.
     """
-    if not payload.get("id"):
-        Errors.generate(request, 400, "No ID provided in token.")
-    user_data: UserModel = get_user(session, uuid.UUID(payload.get("id")))
     logger.info(
-        f"AUDIT: User {payload.get('id')} ({user_data.first_name} {user_data.last_name})  is dropping out of HPCC."
+        f"AUDIT: User {user_data.id} ({user_data.first_name} {user_data.last_name})  is dropping out of HPCC."
     )
     user_data.waitlist = 0
     session.add(user_data)
-    session.commit()
+    await session.commit()
+    roster_cache.invalidate(user_data.assigned_run)
 
     return RedirectResponse("/profile/", status_code=status.HTTP_302_FOUND)
 
 
 @router.get("/team")
-@Authentication.member
 async def get_team_info(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
+    user_data: CurrentUser,
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Gets team information of a given user.
     """
 
-    team = Plinko.get_team(session, payload.get("id"))
+    team = await Plinko.team_for(session, user_data.team_number, user_data.assigned_run)
     if team:
         return team
     else:
-        Errors.generate(request, 400, "User is not in any teams.")
+        return Errors.generate(request, 400, "User is not in any teams.")
 
 
 @router.get("/bot")
-@Authentication.admin
 async def bot_get_team_info(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     run: Optional[str] = "FAIL",
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Expose teams for a given run in a format understood by PlinkoBot.
@@ -146,76 +145,65 @@ async def bot_get_team_info(
     if run == "FAIL":
         return Errors.generate(request, 404, "Missing ?run")
 
-    # Get all participants
-    statement = select(UserModel).options(selectinload(UserModel.discord))
-    users = session.exec(statement)
-    data = []
-    for user in users:
-        user = user_to_dict(user)
-        data.append(user)
+    return ORJSONResponse(await Plinko.get_bot_teams(session, run))
 
-    output = []
-    # Find hightest index.
-    team_count = -1
-    for user in data:
-        if user.get("team_number"):
-            team_number = int(user.get("team_number"))
-            if team_number > team_count:
-                team_count = team_number
 
-    # Populate output with correct number of indexes.
-    for i in range(team_count):
-        output.append([])
+@router.get("/roster")
+async def get_roster(
+    request: Request,
+    payload: AdminPayload,
+    run: Optional[str] = "FAIL",
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Confirmed members of every team in a run, indexed by team number - 1.
+    Used by the check-in dashboard.
+    """
 
-    for user in data:
-        if (
-            user.get("assigned_run").lower() == run.lower()
-            and user.get("team_number")
-            and user.get("waitlist") == 1
-        ):
-            team_idx = int(user.get("team_number")) - 1
+    if run == "FAIL":
+        return Errors.generate(request, 404, "Missing ?run")
 
-            output[team_idx].append(user.get("discord_id"))
+    roster = await roster_cache.get(session, run)
+    output = [[] for _ in range(max(roster, default=0))]
+    for team_number, members in roster.items():
+        if team_number > 0:
+            output[team_number - 1] = members
 
-    return output
+    return ORJSONResponse({"data": output})
 
 
 @router.get("/scanner")
-@Authentication.admin
-async def get_waitlist(request: Request, token: Optional[str] = Cookie(None)):
+async def get_waitlist(request: Request, payload: AdminPayload):
     return templates.TemplateResponse("checkin_qr.html", {"request": request})
 
 
 @router.get("/dash")
-@Authentication.admin
-async def get_dash(request: Request, token: Optional[str] = Cookie(None)):
+async def get_dash(request: Request, payload: AdminPayload):
     return templates.TemplateResponse("dash.html", {"request": request})
 
 
 @router.get("/scoreboard")
-@Authentication.admin
-async def get_scoreboard(request: Request, token: Optional[str] = Cookie(None)):
+async def get_scoreboard(request: Request, payload: AdminPayload):
     return templates.TemplateResponse(
-        "scoreboard.html", {"request": request, "domain": Settings().http.domain}
+        "scoreboard.html", {"request": request, "domain": settings_snapshot.http.domain}
     )
 
 
 @router.get("/scoreboard/edit")
-@Authentication.admin
-async def hack_scoreboard(request: Request, token: Optional[str] = Cookie(None)):
+async def hack_scoreboard(request: Request, payload: AdminPayload):
     return templates.TemplateResponse(
-        "scoreboard_editor.html", {"request": request, "domain": Settings().http.domain}
+        "scoreboard_editor.html",
+        {"request": request, "domain": settings_snapshot.http.domain},
     )
 
 
 @router.get("/checkin")
-@Authentication.admin
 async def checkin(
     request: Request,
-    token: Optional[str] = Cookie(None),
+    payload: AdminPayload,
     member_id: Optional[uuid.UUID] = "FAIL",
     run: Optional[str] = "FAIL",
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Check-in a user for a given run.
@@ -225,13 +213,13 @@ async def checkin(
         return Errors.generate(request, 404, "User Not Found (or run not defined)")
 
     try:
-        user_data = get_user(session, member_id)
+        user_data = await get_user(session, member_id)
     except ValueError:
         user_data = None
 
     if not user_data:
-        query = session.query(UserModel).filter(UserModel.hackucf_id == member_id)
-        user_data = query.first()
+        statement = select(UserModel).where(UserModel.hackucf_id == member_id)
+        user_data = (await session.exec(statement)).first()
         if not user_data:
             return {
                 "success": False,
@@ -248,29 +236,33 @@ async def checkin(
 
     user_data.checked_in = True
     session.add(user_data)
-    session.commit()
+    await session.commit()
+    roster_cache.patch_member(
+        user_data.assigned_run,
+        user_data.team_number,
+        user_data.discord_id,
+        checked_in=True,
+    )
 
     team_number = -1
     if user_data.team_number:
         team_number = user_data.team_number
 
-    return {"success": True, "msg": "Checked in!", "user": user_data}
+    return ORJSONResponse({"success": True, "msg": "Checked in!", "user": user_data})
 
 
 @router.get("/join")
-@Authentication.member
 async def join_waitlist(
     request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
+    user_data: CurrentUser,
+    session: AsyncSession = Depends(get_session),
 ):
-    signups, waitlist_status, group = Plinko.get_waitlist_status(session, plus_one=True)
+    signups, waitlist_status, group = await Plinko.get_waitlist_status(
+        session, plus_one=True
+    )
     print(waitlist_status)
 
     # start adding the person to the list
-    user_data = get_user(session, uuid.UUID(payload.get("id")))
-
     if user_data.sudo == True:
         return templates.TemplateResponse(
             "denied.html",
@@ -299,8 +291,8 @@ async def join_waitlist(
             )
 
     # Check if user is an Organizer (i.e., they are on the banned guild)
-    check_organizer = Discord.check_presence(
-        user_data.discord_id, Settings().discord.organizer_guild_id
+    check_organizer = await Discord.check_presence(
+        user_data.discord_id, settings_snapshot.discord.organizer_guild_id
     )
     if check_organizer:
         return templates.TemplateResponse(
@@ -317,24 +309,18 @@ async def join_waitlist(
 
     # If spots open...
     if elgible:
-        # If user already has a spot, show it.
-        if user_data.waitlist != None:
-            old_group_if_rechecking = user_data.waitlist
-            if old_group_if_rechecking == 1:
-                return templates.TemplateResponse("approved.html", {"request": request})
-
-            # check if user is about to jeopardize their waitlist position
-            elif old_group_if_rechecking != 0 and group > old_group_if_rechecking:
-                return templates.TemplateResponse(
-                    "waitlist.html",
-                    {"request": request, "group": old_group_if_rechecking},
-                )
-
-        # Add to waitlist (or roster)
-        logger.info(f"We can update -> {group}")
-        user_data.waitlist = group
-        session.add(user_data)
-        session.commit()
+        # Add to waitlist (or roster). This also keeps an existing spot, and
+        # never moves someone further back than the group they already hold.
+        waitlist_status, group = await Plinko.admit(session, user_data)
+
+        if waitlist_status == "Closed":
+            return templates.TemplateResponse(
+                "denied.html",
+                {
+                    "request": request,
+                    "rationale": "We have ran out of space in the Horse Plinko Cyber Challenge, and the waitlist is too long.",
+                },
+            )
 
         if waitlist_status == "Waitlisted":
             return templates.TemplateResponse(
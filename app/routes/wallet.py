@@ -2,32 +2,39 @@ import json
 import logging
 import os
 import uuid
-from typing import Optional
+from functools import lru_cache
 
 import requests
-from airpress import PKPass
-from fastapi import APIRouter, Cookie, Depends, Request, Response
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse, RedirectResponse
-from google.auth import crypt, jwt
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from pydantic import error_wrappers, validator
 
 from app.models.info import InfoModel
-from app.models.user import PublicContact, UserModel, user_to_dict
-from app.util.authentication import Authentication
-from app.util.database import Session, get_session, get_user
+from app.models.user import PublicContact, UserModel
+from app.util.authentication import CurrentUser
 from app.util.errors import Errors
+from app.util.responses import ORJSONResponse
+from app.util.serializers import serialize
 from app.util.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Vendored from google-api-python-client, so building the client never
+# depends on reaching Google's discovery service.
+WALLETOBJECTS_DISCOVERY = os.path.join(
+    os.path.dirname(__file__), "..", "util", "discovery", "walletobjects.v1.json"
+)
+
 router = APIRouter(
-    prefix="/wallet", tags=["API", "MobileWallet"], responses=Errors.basic_http()
+    prefix="/wallet",
+    tags=["API", "MobileWallet"],
+    responses=Errors.basic_http(),
+    default_response_class=ORJSONResponse,
 )
 
 
+# The Google client libraries and airpress are imported where they are used,
+# so workers that never issue a pass don't pay for importing them.
 class GoogleWallet:
     def __init__(self):
         self.auth_dict = json.loads(
@@ -38,12 +45,16 @@ class GoogleWallet:
 
     def auth(self):
         """Create authenticated HTTP client using a service account file."""
+        from google.oauth2.service_account import Credentials
+        from googleapiclient.discovery import build_from_document
+
         self.credentials = Credentials.from_service_account_info(
             self.auth_dict,
             scopes=["https://www.googleapis.com/auth/wallet_object.issuer"],
         )
 
-        self.client = build("walletobjects", "v1", credentials=self.credentials)
+        with open(WALLETOBJECTS_DISCOVERY) as f:
+            self.client = build_from_document(f.read(), credentials=self.credentials)
 
     # [END auth]
     # [START createObject]
@@ -60,6 +71,8 @@ class GoogleWallet:
         Returns:
             The pass object ID: f"{issuer_id}.{object_suffix}"
         """
+        from googleapiclient.errors import HttpError
+
         user_id = str(user_data.id)
         team_number = str(user_data.team_number)
         # Check if the object exists
@@ -152,6 +165,8 @@ class GoogleWallet:
         }
 
         # The service account credentials are used to sign the JWT
+        from google.auth import crypt, jwt
+
         signer = crypt.RSASigner.from_service_account_info(self.auth_dict)
         token = jwt.encode(signer, claims).decode("utf-8")
 
@@ -160,8 +175,14 @@ class GoogleWallet:
     # [END jwtExisting]
 
 
-if Settings().google_wallet.enable:
-    google_wallet = GoogleWallet()
+@lru_cache(maxsize=None)
+def get_google_wallet() -> GoogleWallet:
+    """
+    Returns this worker's GoogleWallet, creating it on first use. The
+    credentials and API client are then shared by every request.
+    """
+    return GoogleWallet()
+
 
 """
 Used to get Discord image.
@@ -183,6 +204,8 @@ User data -> Apple Wallet blob
 
 
 def apple_wallet(user_data):
+    from airpress import PKPass
+
     # Create empty pass package
     p = PKPass()
 
@@ -361,17 +384,8 @@ async def get_root():
 
 
 @router.get("/apple")
-@Authentication.member
-async def aapl_gen(
-    request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
-):
-    # Get data from DynamoDB
-    user_data = get_user(session, uuid.UUID(payload.get("id")))
-
-    p = apple_wallet(user_to_dict(user_data))
+async def aapl_gen(request: Request, user_data: CurrentUser):
+    p = apple_wallet(serialize(user_data))
 
     return Response(
         content=bytes(p),
@@ -381,14 +395,9 @@ async def aapl_gen(
 
 
 @router.get("/google")
-@Authentication.member
-async def google_wallet(
-    request: Request,
-    token: Optional[str] = Cookie(None),
-    payload: Optional[object] = {},
-    session: Session = Depends(get_session),
-):
-    user_data = get_user(session, uuid.UUID(payload.get("id")))
+async def google_wallet(request: Request, user_data: CurrentUser):
+    if not Settings().google_wallet.enable:
+        return Errors.generate(request, 404, "Google Wallet is not enabled.")
 
     issuer_id = Settings().google_wallet.issuer_id
     # TODO fix this
@@ -399,8 +408,9 @@ async def google_wallet(
     else:
         return Errors()
 
-    object_id = google_wallet.create_object(issuer_id, class_suffix, user_data)
-    redir_url = google_wallet.create_jwt_existing_objects(
+    wallet = get_google_wallet()
+    object_id = wallet.create_object(issuer_id, class_suffix, user_data)
+    redir_url = wallet.create_jwt_existing_objects(
         issuer_id,
         str(user_data.id),
         class_suffix,
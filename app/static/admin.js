@@ -43,12 +43,8 @@ function load() {
   let count_waitlist = 0;
   let count_all = 0;
 
-  fetch("/admin/list")
-    .then((data) => {
-      return data.json();
-    })
+  fetchAllUsers(`/admin/list?fields=${LIST_FIELDS.join(",")}`)
     .then((data2) => {
-      data2 = data2.data;
       for (let i = 0; i < data2.length; i++) {
         member = data2[i];
 
@@ -83,6 +79,49 @@ function load() {
 
       document.querySelector(".right").innerHTML +=
         `<br>${count_competing} competing, ${count_waitlist} waitlisted, ${count_all} total`;
+    })
+    .catch((err) => {
+      alert(`Could not load users: ${err.message}`);
+    });
+}
+
+// Everything the table and the details pane read.
+const LIST_FIELDS = [
+  "first_name",
+  "last_name",
+  "email",
+  "did_get_shirt",
+  "shirt_size",
+  "team_name",
+  "availability",
+  "sudo",
+  "hackucf_id",
+  "experience",
+  "waitlist",
+  "team_number",
+  "assigned_run",
+  "checked_in",
+  "did_agree_to_do_kh",
+  "did_sign_photo_release",
+  "hackucf_member",
+  "discord_id",
+  "discord.username",
+  "discord.avatar",
+];
+
+// Follows /admin/list cursors until every page has been fetched.
+function fetchAllUsers(url, after = null, users = []) {
+  const page = after ? `${url}&after=${encodeURIComponent(after)}` : url;
+  return fetch(page)
+    .then(async (data) => {
+      const json = await data.json();
+      if (!data.ok) throw new Error(json.detail || data.statusText);
+      return json;
+    })
+    .then((json) => {
+      users.push(...json.data);
+      if (json.next) return fetchAllUsers(url, json.next, users);
+      return users;
     });
 }
 
@@ -51,40 +51,13 @@ function populate_page(teams) {
 }
 
 function update() {
-  fetch("/admin/list")
+  fetch(`/plinko/roster?run=${encodeURIComponent(event.toLowerCase())}`)
     .then((data) => {
       return data.json();
     })
     .then((json) => {
-      const data = json.data;
-
-      // Find number of teams
-      let team_count = -1;
-      for (let i = 0; i < data.length; i++) {
-        const user = data[i];
-
-        if (user.team_number > team_count) team_count = user.team_number;
-      }
-
-      // Prepare team-info array for filling
-      let teams = [];
-      for (let i = 0; i < team_count; i++) {
-        teams.push([]);
-      }
-
-      // Populate team-info array
-      for (let i = 0; i < data.length; i++) {
-        const user = data[i];
-
-        if (
-          user.waitlist === 1 &&
-          user.assigned_run.toLowerCase() === event.toLowerCase()
-        ) {
-          teams[Number(user.team_number) - 1].push(user);
-        }
-      }
-
-      populate_page(teams);
+      // Confirmed members of this run, indexed by team number - 1.
+      populate_page(json.data);
     });
 }
 
@@ -153,6 +153,35 @@ function get_body() {
     return body;
 }
 
+// Highlights a field that needs fixing, or clears the highlight.
+function mark_field(el, is_bad) {
+    if (is_bad) {
+        if (el.nodeName == "FIELDSET") {
+            el.style.color = "var(--hackucf-error)";
+            el.style.fontWeight = "bold";
+        } else {
+            el.style.background = "var(--hackucf-error)";
+            el.style.color = "white";
+            if (el.placeholder) {
+                el.placeholder = el.placeholder.replaceAll(" (required!)", "");
+                el.placeholder += " (required!)";
+            }
+        }
+    } else {
+        // Revert previous style changes if input filled out.
+        if (el.nodeName == "FIELDSET") {
+            el.style.color = "var(--text)";
+            el.style.fontWeight = "normal";
+        } else {
+            el.style.background = "var(--hackucf-off-white)";
+            el.style.color = "black";
+            if (el.placeholder) {
+                el.placeholder = el.placeholder.replaceAll(" (required!)", "");
+            }
+        }
+    }
+}
+
 function validate_required(is_loud) {
     const els = document.querySelectorAll("[required]");
     let result = true;
@@ -162,32 +191,11 @@ function validate_required(is_loud) {
         // Undefined checks
         if (typeof(value) == "undefined" || !RegExp(els[i].pattern).test(value)) {
             // is_loud makes us populate 'validation required' texts.
-            if (is_loud) {
-                if (els[i].nodeName == "FIELDSET") {
-                    els[i].style.color = "var(--hackucf-error)";
-                    els[i].style.fontWeight = "bold";
-                } else {
-                    els[i].style.background = "var(--hackucf-error)";
-                    els[i].style.color = "white";
-                    if (els[i].placeholder) {
-                        els[i].placeholder = els[i].placeholder.replaceAll(" (required!)", "");
-                        els[i].placeholder += " (required!)";
-                    }
-                }
-            }
+            if (is_loud)
+                mark_field(els[i], true);
             result = false;
         } else if (is_loud) {
-            // Revert previous style changes if input filled out.
-            if (els[i].nodeName == "FIELDSET") {
-                els[i].style.color = "var(--text)";
-                    els[i].style.fontWeight = "normal";
-            } else {
-                els[i].style.background = "var(--hackucf-off-white)";
-                els[i].style.color = "black";
-                if (els[i].placeholder) {
-                    els[i].placeholder = els[i].placeholder.replaceAll(" (required!)", "");
-                }
-            }
+            mark_field(els[i], false);
         }
     }
 
@@ -198,12 +206,128 @@ function validate_required(is_loud) {
 }
 
 
-// Submits data to the API, then goes to the given page.
-function submit_and_nav(target_url) {
+// The form name in a /join/<form>/ path.
+function get_form_id() {
     const path = window.location.pathname;
     const second_slash = path.indexOf("/", 2) + 1;
     const third_slash = path.indexOf("/", second_slash);
-    const form_id = path.substring(second_slash, third_slash);
+    return path.substring(second_slash, third_slash);
+}
+
+
+// Answers to form pages the user moved past but that are not submitted yet.
+function get_pending_pages() {
+    return JSON.parse(sessionStorage.getItem("form_pages") || "{}");
+}
+
+
+// Sets an element to a value as returned by get_value().
+function set_value(el, value) {
+    const key = el.getAttribute("name");
+    const other_id = key.replaceAll(".", "_").replaceAll(" ", "_");
+
+    if (el.nodeName == "INPUT") {
+        el.value = value;
+    } else if (el.nodeName == "SELECT") {
+        if (el.querySelector(`option[value="${CSS.escape(String(value))}"]`)) {
+            el.value = value;
+        } else if (el.querySelector("option[value='_other']")) {
+            el.value = "_other";
+            const other = el.parentElement.querySelector(".other_dropdown");
+            other.style.display = "block";
+            other.value = value;
+        }
+    } else if (el.nodeName == "FIELDSET") {
+        // Checkbox answers are joined with ", " (radios hold one).
+        let remaining = el.classList.contains("checkbox") ? String(value).split(", ") : [String(value)];
+        let options = el.querySelectorAll("div > input");
+        for (let j = 0; j < options.length; j++) {
+            options[j].checked = remaining.includes(options[j].value);
+            remaining = remaining.filter(part => part != options[j].value);
+        }
+        const other_box = el.querySelector("input[value='_other']");
+        if (remaining.length && other_box) {
+            other_box.checked = true;
+            const other = document.querySelector(`.other_checkbox#${other_id}`);
+            other.style.display = "block";
+            other.value = remaining.join(", ");
+        }
+    }
+}
+
+
+// Pages are rendered from saved data, which does not have the answers still
+// pending; put those back so going back a page doesn't lose them.
+function restore_pending_page() {
+    const page = get_pending_pages()[get_form_id()];
+    if (!page)
+        return;
+
+    const els = document.querySelectorAll(".kennelish_input");
+    for (let i = 0; i < els.length; i++) {
+        const value = page[els[i].getAttribute("name")];
+        if (typeof(value) != "undefined")
+            set_value(els[i], value);
+    }
+}
+
+
+// Set while moving between form pages, when pending pages must be kept.
+let keep_pending_pages = false;
+
+// Saves pending pages if the user leaves the flow some other way (closing
+// the tab, following a link), like submitting each page used to.
+function flush_pending_pages() {
+    const pages = get_pending_pages();
+    if (keep_pending_pages || Object.keys(pages).length == 0)
+        return;
+
+    // keepalive lets the request outlive the page. The pages are only
+    // dropped once the server has saved them; otherwise they are restored
+    // the next time the user opens the form.
+    fetch("/api/forms", {
+        method: "POST",
+        mode: "same-origin",
+        credentials: "same-origin",
+        keepalive: true,
+        "headers": {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify(pages)
+    }).then(resp => {
+        if (resp.ok)
+            sessionStorage.removeItem("form_pages");
+    })
+}
+
+
+// Highlights the fields the server rejected (the 422 detail from /api/forms)
+// if they are on this page.
+function show_form_errors(detail) {
+    if (detail.form != get_form_id())
+        return false;
+
+    let names = [];
+    for (let i = 0; i < detail.errors.length; i++) {
+        const key = detail.errors[i].loc[0];
+        const el = document.querySelector(`.kennelish_input[name="${CSS.escape(String(key))}"]`);
+        if (el) {
+            mark_field(el, true);
+            names.push(el.placeholder ? el.placeholder.replaceAll(" (required!)", "") : key);
+        }
+    }
+
+    if (names.length)
+        banner("Please check these answers: " + names.join(", "));
+    else
+        banner("Your answers could not be saved. Please check them and try again.");
+    return true;
+}
+
+
+// Submits data to the API, then goes to the given page.
+function submit_and_nav(target_url) {
+    const form_id = get_form_id();
 
     // Check if fields marked required were completed.
     // This /is/ a client-side check at first, but there is
@@ -221,18 +345,47 @@ function submit_and_nav(target_url) {
     }
 
     // Creates body from current page's elements
-    let body = get_body();
+    let pages = get_pending_pages();
+    pages[form_id] = get_body();
+
+    // Moving on to another form page: hold this one until the flow ends,
+    // then submit every page in one request.
+    if (/^\/join\/[^\/]+\/$/.test(target_url)) {
+        sessionStorage.setItem("form_pages", JSON.stringify(pages));
+        keep_pending_pages = true;
+        window.location.href = target_url;
+        return;
+    }
 
-    fetch(`/api/form/${form_id}`, {
+    // Kept until the server confirms the save.
+    sessionStorage.setItem("form_pages", JSON.stringify(pages));
+    keep_pending_pages = true;
+
+    fetch("/api/forms", {
         method: "POST",
         mode: "same-origin",
         credentials: "same-origin",
         "headers": {
             "Content-Type": "application/json",
         },
-        body: JSON.stringify(body)
-    }).then(_ => {
-        window.location.href = target_url;
+        body: JSON.stringify(pages)
+    }).then(async resp => {
+        if (resp.status == 422) {
+            const detail = (await resp.json()).detail;
+            if (!show_form_errors(detail)) {
+                // The bad answer is on an earlier page: go back to it.
+                sessionStorage.setItem("form_errors", JSON.stringify(detail));
+                window.location.href = `/join/${encodeURIComponent(detail.form)}/`;
+                return;
+            }
+        } else if (!resp.ok) {
+            banner("Your answers could not be saved. Please try again.");
+        } else {
+            sessionStorage.removeItem("form_pages");
+            window.location.href = target_url;
+            return;
+        }
+        keep_pending_pages = false;
     })
 }
 
@@ -265,7 +418,19 @@ function logoff() {
 }
 
 
+window.addEventListener("pagehide", flush_pending_pages);
+
 window.onload = (evt) => {
+    if (window.location.pathname.startsWith("/join/") && document.querySelector(".kennelish_input")) {
+        restore_pending_page();
+
+        const errors = sessionStorage.getItem("form_errors");
+        if (errors) {
+            sessionStorage.removeItem("form_errors");
+            show_form_errors(JSON.parse(errors));
+        }
+    }
+
     if (document.getElementById("resetInfra")) {
         document.getElementById("resetInfra").onclick = evt => {
             resetInfra();
@@ -1,33 +1,119 @@
+import hashlib
 import time
-from functools import wraps
-from typing import Optional
+import uuid
+from collections import OrderedDict
+from typing import Annotated, Optional
 
-from fastapi import Request, status
+from fastapi import Cookie, Depends, Request, status
 from fastapi.responses import RedirectResponse
 from jose import JWTError, jwt
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.user import UserModel
+from app.util.database import get_session, get_user
 
 # Import options and errors
 from app.util.errors import Errors
-from app.util.settings import Settings
+from app.util.sessions import session_store
+from app.util.settings import settings_snapshot
 
-if Settings().telemetry.enable:
+if settings_snapshot.telemetry.enable:
     from sentry_sdk import set_user
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified JWTs, keyed by the token's SHA-256 digest.
+
+    Entries expire at the token's lifetime boundary (issued + lifetime_sudo
+    for sudoers, + lifetime_user otherwise), so a session polling the API
+    only pays for signature verification once. The validity checks in the
+    dependencies still run against the cached payload on every request.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str):
+        digest = hashlib.sha256(token.encode()).digest()
+        entry = self.entries.get(digest)
+        if entry is not None:
+            expires, payload = entry
+            if time.time() < expires:
+                self.entries.move_to_end(digest)
+                self.hits += 1
+                return payload
+            del self.entries[digest]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: dict, expires: float):
+        if time.time() >= expires:
+            return
+        digest = hashlib.sha256(token.encode()).digest()
+        self.entries[digest] = (expires, payload)
+        self.entries.move_to_end(digest)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache()
+
+
 class Authentication:
     def __init__(self):
         super(Authentication, self).__init__
 
-    def admin_validate(token):
+    def decode(token):
+        """
+        Verifies a JWT and returns its payload, raising JWTError if invalid.
+        """
+        payload = token_cache.get(token)
+        if payload is None:
+            jwt_config = settings_snapshot.jwt
+            payload = jwt.decode(
+                token,
+                jwt_config.secret.get_secret_value(),
+                algorithms=jwt_config.algorithm,
+            )
+            if payload.get("sudo"):
+                lifetime = jwt_config.lifetime_sudo
+            else:
+                lifetime = jwt_config.lifetime_user
+            token_cache.put(token, payload, payload.get("issued", -1) + lifetime)
+        # Callers get their own copy; the cached payload is shared.
+        return dict(payload)
+
+    async def load(token):
+        """
+        Resolves a login cookie, either a server-side session id (see
+        app.util.sessions) or a JWT, to its payload. Raises JWTError if invalid.
+        """
+        if session_store.is_session_id(token):
+            payload = await session_store.get(token)
+            if payload is None:
+                raise JWTError("Unknown, expired or revoked session")
+            return dict(payload)
+        return Authentication.decode(token)
+
+    async def admin_validate(token):
         if not token:
             return False
 
         try:
-            payload = jwt.decode(
-                token,
-                Settings().jwt.secret.get_secret_value(),
-                algorithms=Settings().jwt.algorithm,
-            )
+            payload = await Authentication.load(token)
             is_admin: bool = payload.get("sudo", False)
             creation_date: float = payload.get("issued", -1)
         except Exception:
@@ -36,101 +122,126 @@ class Authentication:
         if not is_admin:
             return False
 
-        if time.time() > creation_date + Settings().jwt.lifetime_sudo:
+        if time.time() > creation_date + settings_snapshot.jwt.lifetime_sudo:
             return False
 
         return True
 
-    def admin(func):
-        @wraps(func)
-        async def wrapper(request: Request, token: Optional[str], *args, **kwargs):
-            # Validate auth.
-            if not token:
-                return RedirectResponse(
-                    "/discord/new?redir=" + request.url.path,
-                    status_code=status.HTTP_302_FOUND,
-                )
-
-            try:
-                payload = jwt.decode(
-                    token,
-                    Settings().jwt.secret.get_secret_value(),
-                    algorithms=Settings().jwt.algorithm,
-                )
-                is_admin: bool = payload.get("sudo", False)
-                creation_date: float = payload.get("issued", -1)
-            except Exception:
-                tr = Errors.generate(
-                    request,
-                    403,
-                    "Invalid token provided. Please log in again (refresh the page) and try again.",
-                )
-                tr.delete_cookie(key="token")
-                return tr
-
-            if not is_admin:
-                return Errors.generate(
-                    request,
-                    403,
-                    "You are not a sudoer.",
-                    essay="If you think this is an error, please try logging in again.",
-                )
-
-            if time.time() > creation_date + Settings().jwt.lifetime_sudo:
-                return Errors.generate(
-                    request,
-                    403,
-                    "Session not new enough to verify sudo status.",
-                    essay="Unlike normal log-in, non-bot sudoer sessions only last a day. This is to ensure the security of Hack@UCF member PII. "
-                    "Simply re-log into Onboard to continue.",
-                )
-
-            return await func(request, token, *args, **kwargs)
-
-        return wrapper
-
-    def member(func):
-        @wraps(func)
-        async def wrapper_member(
-            request: Request,
-            token: Optional[str],
-            payload: Optional[object],
-            *args,
-            **kwargs,
-        ):
-            # Validate auth.
-            if not token:
-                return RedirectResponse(
-                    "/discord/new?redir=" + request.url.path,
-                    status_code=status.HTTP_302_FOUND,
-                )
-
-            try:
-                payload = jwt.decode(
-                    token,
-                    Settings().jwt.secret.get_secret_value(),
-                    algorithms=Settings().jwt.algorithm,
-                )
-                creation_date: float = payload.get("issued", -1)
-            except Exception:
-                tr = Errors.generate(
-                    request,
-                    403,
-                    "Invalid token provided. Please log in again (refresh the page) and try again.",
-                )
-                tr.delete_cookie(key="token")
-                return tr
-
-            if time.time() > creation_date + Settings().jwt.lifetime_user:
-                return Errors.generate(
-                    request,
-                    403,
-                    "Session expired.",
-                    essay="Sessions last for about fifteen weeks. You need to re-log-in between semesters.",
-                )
-            if Settings().telemetry.enable:
-                set_user({"id": payload["id"]})
-
-            return await func(request, token, payload, *args, **kwargs)
-
-        return wrapper_member
+
+class AuthenticationError(Exception):
+    """
+    Raised by the authentication dependencies. Carries the response (a login
+    redirect or an error page) that is sent instead of running the route;
+    see the exception handler in app/index.py.
+    """
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+async def require_token(request: Request, token: Optional[str]) -> dict:
+    # Validate auth.
+    if not token:
+        raise AuthenticationError(
+            RedirectResponse(
+                "/discord/new?redir=" + request.url.path,
+                status_code=status.HTTP_302_FOUND,
+            )
+        )
+
+    try:
+        return await Authentication.load(token)
+    except Exception:
+        tr = Errors.generate(
+            request,
+            403,
+            "Invalid token provided. Please log in again (refresh the page) and try again.",
+        )
+        tr.delete_cookie(key="token")
+        raise AuthenticationError(tr)
+
+
+async def member_payload(request: Request, token: Optional[str] = Cookie(None)):
+    """
+    Dependency for member routes: the verified JWT payload of the caller.
+    """
+    payload = await require_token(request, token)
+    creation_date: float = payload.get("issued", -1)
+
+    if time.time() > creation_date + settings_snapshot.jwt.lifetime_user:
+        raise AuthenticationError(
+            Errors.generate(
+                request,
+                403,
+                "Session expired.",
+                essay="Sessions last for about fifteen weeks. You need to re-log-in between semesters.",
+            )
+        )
+    if settings_snapshot.telemetry.enable:
+        set_user({"id": payload["id"]})
+
+    return payload
+
+
+async def admin_payload(request: Request, token: Optional[str] = Cookie(None)):
+    """
+    Dependency for sudoer routes: the verified JWT payload of the caller.
+    """
+    payload = await require_token(request, token)
+    is_admin: bool = payload.get("sudo", False)
+    creation_date: float = payload.get("issued", -1)
+
+    if not is_admin:
+        raise AuthenticationError(
+            Errors.generate(
+                request,
+                403,
+                "You are not a sudoer.",
+                essay="If you think this is an error, please try logging in again.",
+            )
+        )
+
+    if time.time() > creation_date + settings_snapshot.jwt.lifetime_sudo:
+        raise AuthenticationError(
+            Errors.generate(
+                request,
+                403,
+                "Session not new enough to verify sudo status.",
+                essay="Unlike normal log-in, non-bot sudoer sessions only last a day. This is to ensure the security of Hack@UCF member PII. "
+                "Simply re-log into Onboard to continue.",
+            )
+        )
+
+    return payload
+
+
+CurrentPayload = Annotated[dict, Depends(member_payload)]
+AdminPayload = Annotated[dict, Depends(admin_payload)]
+
+
+async def current_user(
+    request: Request,
+    payload: CurrentPayload,
+    session: AsyncSession = Depends(get_session),
+) -> UserModel:
+    """
+    Dependency for member routes: the caller's user row, with its Discord
+    profile loaded. FastAPI caches dependencies per request, so the row is
+    looked up once and shared (through the same session) with the route.
+    """
+    try:
+        return await get_user(
+            session, uuid.UUID(payload.get("id")), use_selectinload=True
+        )
+    except ValueError:
+        tr = Errors.generate(
+            request,
+            403,
+            "Invalid token provided. Please log in again (refresh the page) and try again.",
+        )
+        tr.delete_cookie(key="token")
+        raise AuthenticationError(tr)
+
+
+CurrentUser = Annotated[UserModel, Depends(current_user)]
@@ -1,11 +1,16 @@
 import logging
+import time
 from uuid import UUID
 
 # Create the database
-from alembic import script
-from alembic.runtime import migration
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import selectinload
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
 
 from app.models.user import DiscordModel, UserModel
@@ -14,52 +19,240 @@ from app.util.settings import Settings
 DATABASE_URL = Settings().database.url
 logger = logging.getLogger(__name__)
 
-engine = create_engine(
-    DATABASE_URL,
+# Sync driver -> asyncio driver for the same backend.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Rewrites a configured database URL so it uses an asyncio-capable driver.
+    URLs that already name a driver (e.g. sqlite+aiosqlite://) are left alone.
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for {parsed.drivername} URLs")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Pool defaults per backend, overridable through DatabaseConfig.
+POOL_DEFAULTS = {
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    "postgresql": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+}
+
+
+class PoolMetrics:
+    """
+    Counts connection pool activity so pool_size/max_overflow can be sized
+    against the number of uvicorn workers.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.pool_size = None
+        # Time spent waiting for a free connection, excluding time spent
+        # opening new ones (see MeteredQueuePool).
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connect_total = 0.0
+
+    def attach(self, pool):
+        self.pool_size = pool.size() if hasattr(pool, "size") else None
+        event.listen(pool, "connect", self.on_connect)
+        event.listen(pool, "checkout", self.on_checkout)
+        event.listen(pool, "checkin", self.on_checkin)
+        event.listen(pool, "invalidate", self.on_invalidate)
+
+    def on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        # Checkouts beyond pool_size are served by overflow connections, i.e.
+        # every pooled connection was busy. Whether a request then actually
+        # queued shows in the wait_* figures.
+        if self.pool_size is not None and self.in_use > self.pool_size:
+            self.overflow_checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+        self.in_use = max(0, self.in_use - 1)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def record_acquire(self, elapsed: float, connecting: float):
+        self.connect_total += connecting
+        wait = max(0.0, elapsed - connecting)
+        if wait > 0.001:
+            self.waits += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self):
+        return {
+            "pool_size": self.pool_size,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "waits": self.waits,
+            "wait_total_ms": round(self.wait_total * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_avg_ms": (
+                round(self.wait_total * 1000 / self.checkouts, 3)
+                if self.checkouts
+                else 0.0
+            ),
+            "connect_total_ms": round(self.connect_total * 1000, 3),
+        }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times how long each checkout takes to get a
+    connection. Opening a new connection is timed separately, so what's left
+    is time spent queueing for one (up to pool_timeout).
+    """
+
+    def _create_connection(self):
+        start = time.monotonic()
+        record = super()._create_connection()
+        record._metered_connect = time.monotonic() - start
+        return record
+
+    def _do_get(self):
+        start = time.monotonic()
+        record = super()._do_get()
+        connecting = record.__dict__.pop("_metered_connect", 0.0)
+        pool_metrics.record_acquire(time.monotonic() - start, connecting)
+        return record
+
+
+def engine_options(config) -> dict:
+    """
+    Builds create_async_engine() keyword arguments for the configured backend.
+    In-memory SQLite keeps a single shared connection (StaticPool), since every
+    new connection would otherwise see an empty database.
+    """
+    backend = make_url(config.url).get_backend_name()
+    if backend == "sqlite" and ":memory:" in config.url:
+        return {
+            "connect_args": {"check_same_thread": False},
+            "poolclass": StaticPool,
+        }
+
+    options = dict(POOL_DEFAULTS.get(backend, POOL_DEFAULTS["postgresql"]))
+    for key in options:
+        value = getattr(config, key)
+        if value is not None:
+            options[key] = value
+    options["poolclass"] = MeteredQueuePool
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+engine = create_async_engine(
+    async_database_url(DATABASE_URL),
     # echo=True,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    **engine_options(Settings().database),
 )
 
-if "sqlite:///:memory:" in DATABASE_URL:
-    SQLModel.metadata.create_all(engine)
-    logger.info("Tables created in SQLite in-memory database.")
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine.sync_engine.pool)
 
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+async def init_db():
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
     return
 
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+def open_session() -> AsyncSession:
+    """
+    Creates a session outside of a request's dependency scope, e.g. for a
+    streaming response that is still being sent after its handler returned.
+    """
+    # Objects are read after commit (e.g. to build responses); with an async
+    # session an expired attribute would need an implicit IO round-trip.
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+async def get_session():
+    async with open_session() as session:
+        try:
+            yield session
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
 
 
 def check_current_head(alembic_cfg, connectable):
     # type: (config.Config, engine.Engine) -> bool
     # cfg = config.Config("../alembic.ini")
+    # alembic (and mako/pygments behind it) is only needed here.
+    from alembic import script
+    from alembic.runtime import migration
+
     directory = script.ScriptDirectory.from_config(alembic_cfg)
     with connectable.begin() as connection:
         context = migration.MigrationContext.configure(connection)
         return set(context.get_current_heads()) == set(directory.get_heads())
 
 
-def get_user(session, user_id: UUID, use_selectinload: bool = False) -> UserModel:
-    query = session.query(UserModel).filter(UserModel.id == user_id)
-    if selectinload:
-        query = query.options(selectinload(UserModel.discord))
-    user_data = query.one_or_none()
+async def get_user(
+    session: AsyncSession, user_id: UUID, use_selectinload: bool = False
+) -> UserModel:
+    statement = select(UserModel).where(UserModel.id == user_id)
+    if use_selectinload:
+        statement = statement.options(selectinload(UserModel.discord))
+    user_data = (await session.exec(statement)).one_or_none()
     if not user_data:
         raise ValueError(f"User with ID {user_id} not found.")
     return user_data
 
 
-def get_user_discord(session, discord_id, use_selectinload: bool = False) -> UserModel:
-    query = session.query(UserModel).filter(UserModel.discord_id == discord_id)
-    if selectinload:
-        query = query.options(selectinload(UserModel.discord))
-    user_data = query.one_or_none()
+async def get_user_discord(
+    session: AsyncSession, discord_id, use_selectinload: bool = False
+) -> UserModel:
+    statement = select(UserModel).where(UserModel.discord_id == discord_id)
+    if use_selectinload:
+        statement = statement.options(selectinload(UserModel.discord))
+    user_data = (await session.exec(statement)).one_or_none()
     if not user_data:
         raise ValueError(f"User with Discord ID {discord_id} not found.")
     return user_data
@@ -1,18 +1,52 @@
-import json
 import logging
 
-import requests
+import httpx
 
-from app.util.settings import Settings
+from app.util.settings import settings_snapshot
 
 logger = logging.getLogger(__name__)
 
-if Settings().discord.enable:
-    headers = {
-        "Authorization": f"Bot {Settings().discord.bot_token.get_secret_value() }",
-        "Content-Type": "application/json",
-        "X-Audit-Log-Reason": "Hack@UCF OnboardLite Bot",
-    }
+API_BASE = "https://discord.com/api"
+
+
+class DiscordHTTP:
+    """
+    The worker's shared connection pool to the Discord API.
+
+    Connections are kept alive between calls, so only the first request of a
+    burst pays for the TLS handshake. The client is created on first use and
+    closed on shutdown (see the lifespan in app/index.py).
+    """
+
+    def __init__(self):
+        self.client = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self.client is None or self.client.is_closed:
+            config = settings_snapshot.discord
+            headers = {"X-Audit-Log-Reason": "Hack@UCF OnboardLite Bot"}
+            if config.bot_token is not None:
+                headers["Authorization"] = f"Bot {config.bot_token.get_secret_value()}"
+            self.client = httpx.AsyncClient(
+                base_url=API_BASE,
+                headers=headers,
+                timeout=httpx.Timeout(config.timeout),
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    keepalive_expiry=config.keepalive_expiry,
+                ),
+                # Needs the h2 package (httpx[http2]).
+                http2=config.http2,
+            )
+        return self.client
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+discord_http = DiscordHTTP()
 
 
 class Discord:
@@ -24,75 +58,129 @@ class Discord:
         pass
 
     @staticmethod
-    def check_presence(discord_id, guild_id):
-        if not Settings().discord.enable:
+    async def check_presence(discord_id, guild_id):
+        if not settings_snapshot.discord.enable:
             return False
         """
         Checks if member is in a guild.
         """
 
-        req = requests.get(
-            f"https://discord.com/api/guilds/{guild_id}/members/{discord_id}",
-            headers=headers,
-        )
+        try:
+            req = await discord_http.get().get(
+                f"/guilds/{guild_id}/members/{discord_id}"
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Discord presence check failed: {e!r}")
+            return False
 
         joined = req.status_code < 400 or req.json().get("joined_at", False)
 
         return joined
 
-    def assign_role(discord_id, role_id):
+    @staticmethod
+    async def assign_role(discord_id, role_id):
         discord_id = str(discord_id)
 
-        req = requests.put(
-            f"https://discord.com/api/guilds/{Settings().discord.guild_id}/members/{discord_id}/roles/{Settings.discord.member_role}",
-            headers=headers,
-        )
+        try:
+            req = await discord_http.get().put(
+                f"/guilds/{settings_snapshot.discord.guild_id}/members/{discord_id}/roles/{settings_snapshot.discord.member_role}"
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Discord role assignment failed: {e!r}")
+            return False
 
         return req.status_code < 400
 
     @staticmethod
-    def get_dm_channel_id(discord_id):
+    async def get_dm_channel_id(discord_id):
         discord_id = str(discord_id)
 
         # Get DM channel ID.
         get_channel_id_body = {"recipient_id": discord_id}
-        req = requests.post(
-            f"https://discord.com/api/users/@me/channels",
-            headers=headers,
-            data=json.dumps(get_channel_id_body),
+        req = await discord_http.get().post(
+            "/users/@me/channels", json=get_channel_id_body
         )
         resp = req.json()
 
         return resp.get("id", None)
 
     @staticmethod
-    def send_message(discord_id: str, message: str):
+    async def send_message(discord_id: str, message: str):
         discord_id = str(discord_id)
-        channel_id = Discord.get_dm_channel_id(discord_id)
 
-        send_message_body = {"content": message}
-        req = requests.post(
-            f"https://discord.com/api/channels/{channel_id}/messages",
-            headers=headers,
-            data=json.dumps(send_message_body),
-        )
+        try:
+            channel_id = await Discord.get_dm_channel_id(discord_id)
+
+            send_message_body = {"content": message}
+            req = await discord_http.get().post(
+                f"/channels/{channel_id}/messages", json=send_message_body
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Discord message failed: {e!r}")
+            return False
         print(req.text)
 
         return req.status_code < 400
 
-    def join_plinko_server(self, discord_id: str, token):
-        if not Settings().discord.enable:
+    @staticmethod
+    async def join_plinko_server(discord_id: str, token):
+        if not settings_snapshot.discord.enable:
             return
-        if self.check_presence(discord_id, Settings().discord.guild_id) != "joined":
+        guild_id = settings_snapshot.discord.guild_id
+        if not await Discord.check_presence(discord_id, guild_id):
             logger.info(f"Joining {discord_id} to Plinko Discord")
-            headers = {
-                "Authorization": f"Bot {Settings().discord.bot_token.get_secret_value()}",
-                "Content-Type": "application/json",
-                "X-Audit-Log-Reason": "Hack@UCF OnboardLite Bot",
-            }
             put_join_guild = {"access_token": token["access_token"]}
-            requests.put(
-                f"https://discordapp.com/api/guilds/{Settings().discord.guild_id}/members/{discord_id}",
-                headers=headers,
-                data=json.dumps(put_join_guild),
+            try:
+                await discord_http.get().put(
+                    f"/guilds/{guild_id}/members/{discord_id}", json=put_join_guild
+                )
+            except httpx.HTTPError as e:
+                logger.error(f"Joining {discord_id} to Plinko Discord failed: {e!r}")
+
+    @staticmethod
+    async def exchange_code(code: str):
+        """
+        Trades an OAuth authorization code for the user's token.
+        """
+        config = settings_snapshot.discord
+        data = {
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": config.redirect_base + "_redir",
+        }
+        try:
+            # Basic auth replaces the client's Bot header for this request.
+            req = await discord_http.get().post(
+                "/oauth2/token",
+                data=data,
+                auth=(str(config.client_id), config.secret.get_secret_value()),
             )
+        except httpx.HTTPError as e:
+            logger.error(f"Discord token exchange failed: {e!r}")
+            return None
+
+        if req.status_code >= 400:
+            logger.error(f"Discord token exchange failed: {req.text}")
+            return None
+
+        return req.json()
+
+    @staticmethod
+    async def get_current_user(token):
+        """
+        Gets the Discord profile the OAuth token belongs to.
+        """
+        try:
+            req = await discord_http.get().get(
+                "/users/@me",
+                headers={"Authorization": f"Bearer {token['access_token']}"},
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Discord user lookup failed: {e!r}")
+            return None
+
+        if req.status_code >= 400:
+            logger.error(f"Discord user lookup failed: {req.text}")
+            return None
+
+        return req.json()
@@ -2,8 +2,6 @@ import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-import commonmark
-
 from app.util.settings import Settings
 
 if Settings().email.enable:
@@ -25,6 +23,9 @@ class Email:
         msg["From"] = email
         msg["To"] = recipient
         text = body
+        # Imported on first send; most workers never send email.
+        import commonmark
+
         parser = commonmark.Parser()
         ast = parser.parse(body)
         renderer = commonmark.HtmlRenderer()
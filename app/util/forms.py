@@ -1,9 +1,17 @@
+import hashlib
 import json
 import logging
 import os
+import time
+from functools import cached_property
 from pathlib import Path
 from typing import DefaultDict
 
+import orjson
+from pydantic import BaseModel
+
+from app.util.kennelish import Kennelish, RenderPlan, Transformer
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,17 +28,139 @@ def is_path_allowed(user_path: str, allowed_dir: str) -> bool:
         return False
 
 
+class FormEntry:
+    """
+    A loaded form file. Its render plan and validator are compiled on first
+    use and kept until the file changes (which replaces the entry).
+
+    `digest` is a hash of the file's content, so it only changes when the
+    form does; it versions the form for HTTP caching.
+    """
+
+    def __init__(self, name: str, mtime: int, body: list, digest: str):
+        self.name = name
+        self.mtime = mtime
+        self.body = body
+        self.digest = digest
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    @cached_property
+    def json(self) -> bytes:
+        return orjson.dumps(self.body)
+
+    @cached_property
+    def prefill_fields(self) -> list:
+        return Kennelish.prefill_fields(self.body)
+
+    @cached_property
+    def plan(self) -> RenderPlan:
+        return Kennelish.compile(self.body)
+
+    @cached_property
+    def validator(self) -> type[BaseModel]:
+        return Transformer.kennelish_to_pydantic(self.body)
+
+
+class FormRegistry:
+    """
+    Keeps every form in app/forms in memory, keyed by name ("2" for 2.json).
+
+    Lookups are dict hits. At most every `interval` seconds a lookup rescans
+    the directory, loading new or modified files (by mtime) and dropping
+    deleted ones, so forms can be edited without a restart.
+    """
+
+    def __init__(self, directory: str = "app/forms", interval: float = 2.0):
+        self.directory = directory
+        self.interval = interval
+        self.forms = {}
+        # Name -> mtime of a version that failed to load, so it's logged once.
+        self.failed = {}
+        self.scanned = float("-inf")
+
+    def refresh(self):
+        self.scanned = time.monotonic()
+        seen = set()
+        with os.scandir(os.path.join(os.getcwd(), self.directory)) as files:
+            for file in files:
+                if not file.name.endswith(".json") or not file.is_file():
+                    continue
+                name = file.name.removesuffix(".json")
+                seen.add(name)
+                mtime = file.stat().st_mtime_ns
+                entry = self.forms.get(name)
+                if entry is not None and entry.mtime == mtime:
+                    continue
+                if self.failed.get(name) == mtime:
+                    continue
+                try:
+                    with open(file.path, "rb") as f:
+                        raw = f.read()
+                    digest = hashlib.sha256(raw).hexdigest()[:32]
+                    self.forms[name] = FormEntry(name, mtime, json.loads(raw), digest)
+                    if entry is not None:
+                        logger.info(f"Reloaded form {name}")
+                except (OSError, ValueError) as e:
+                    # e.g. caught mid-write; keep serving the old version.
+                    logger.exception(e)
+                    self.failed[name] = mtime
+
+        for name in self.forms.keys() - seen:
+            del self.forms[name]
+
+    def preload(self):
+        """
+        Loads and compiles every form, so first requests don't pay for it.
+        """
+        self.refresh()
+        for entry in self.forms.values():
+            try:
+                entry.plan
+                entry.validator
+            except Exception as e:
+                logger.exception(e)
+
+    def get(self, file: str) -> FormEntry:
+        if time.monotonic() - self.scanned > self.interval:
+            self.refresh()
+
+        entry = self.forms.get(file)
+        if entry is None:
+            # Registry keys are plain file names, so a traversal attempt can
+            # only miss; still report it as such.
+            form_file = os.path.join(os.getcwd(), self.directory, f"{file}.json")
+            if not is_path_allowed(form_file, self.directory):
+                logger.error("attempted to access unauthorized paths")
+                raise PermissionError("Access to the specified file is not allowed")
+            raise FileNotFoundError(f"No form named {file}")
+        return entry
+
+
+form_registry = FormRegistry()
+
+
 class Forms:
     def get_form_body(file="1"):
-        form_file = os.path.join(os.getcwd(), "app/forms", f"{file}.json")
-        allowed_paths = "app/forms"
-        if not is_path_allowed(form_file, allowed_paths):
-            logger.error("attempted to access unauthorized paths")
-            raise PermissionError("Access to the specified file is not allowed")
-        try:
-            return json.load(open(form_file, "r"))
-        except FileNotFoundError:
-            raise FileNotFoundError
+        return form_registry.get(file).body
+
+    def get_entry(file="1") -> FormEntry:
+        return form_registry.get(file)
+
+    def get_render_plan(file="1") -> RenderPlan:
+        """
+        Returns the compiled Kennelish plan used to render a form.
+        """
+        return form_registry.get(file).plan
+
+    def get_validator(file="1") -> type[BaseModel]:
+        """
+        Returns the generated Pydantic model that validates a form's
+        submissions, shared by every request until the form changes.
+        """
+        return form_registry.get(file).validator
 
 
 def fuzzy_parse_value(value):
@@ -184,6 +184,243 @@ class Kennelish:
     def invalid(entry):
         return f"<h3 class='invalid'>Invalid Input: {entry['input']}</h3>"
 
+    def compile(obj):
+        """
+        Compiles a form into a RenderPlan whose render(user_data) output is
+        identical to parse(obj, user_data). Everything that does not depend on
+        the user is rendered once here.
+        """
+        segments = []
+        Kennelish.compile_into(segments, obj)
+
+        # Merge runs of static HTML into single chunks.
+        merged = []
+        for segment in segments:
+            if type(segment) is str and merged and type(merged[-1]) is str:
+                merged[-1] += segment
+            else:
+                merged.append(segment)
+        return RenderPlan(merged)
+
+    def compile_into(segments, obj):
+        for entry in obj:
+            compiled = []
+            try:
+                if entry["input"] in ("h1", "h2", "h3", "p"):
+                    tag = entry["input"]
+                    compiled.append(f"<{tag}>{entry.get('label', '')}</{tag}>")
+                    Kennelish.compile_into(compiled, entry.get("elements", []))
+                elif entry["input"] in ("email", "nid", "text"):
+                    compiled.append(Kennelish.compile_text(entry, entry["input"]))
+                elif entry["input"] in ("radio", "slider", "dropdown"):
+                    compiled.append(Kennelish.compile_choice(entry))
+                elif entry["input"] == "signature":
+                    compiled.append(Kennelish.compile_signature(entry))
+                elif entry["input"] == "checkbox":
+                    compiled.append(Kennelish.checkbox(entry))
+                elif entry["input"] == "navigation":
+                    compiled.append(Kennelish.navigation(entry))
+                else:
+                    compiled.append(Kennelish.invalid(entry))
+            except Exception as e:
+                logger.exception(e)
+                compiled = [Kennelish.invalid({"input": "Malformed object"})]
+            segments.extend(compiled)
+
+    def compile_text(entry, inp_type):
+        if not entry.get("prefill", True):
+            return Kennelish.text(entry, None, inp_type)
+
+        key = entry.get("key", "")
+        chunks = Kennelish.text(entry, {key: SLOT}, inp_type).split(SLOT)
+        if len(chunks) != 2:
+            return DynamicSegment(Kennelish.text, entry, inp_type)
+
+        def fill(user_data):
+            return (f"{Kennelish.prefill_value(inp_type, key, user_data)}",)
+
+        return SlotSegment(chunks, fill)
+
+    def compile_signature(entry):
+        chunks = Kennelish.signature(entry, {"first_name": SLOT, "surname": SLOT})
+        chunks = chunks.split(SLOT)
+        if len(chunks) != 3:
+            return DynamicSegment(Kennelish.signature, entry)
+
+        def fill(user_data):
+            first_name = user_data.get(
+                "first_name", "HackUCF Member #" + str(user_data.get("id"))
+            )
+            return (f"{first_name}", f"{user_data.get('surname', '')}")
+
+        return SlotSegment(chunks, fill)
+
+    def compile_choice(entry):
+        """
+        Radios, sliders and dropdowns differ between users only in which
+        option is preselected, so each possible selection is rendered up front.
+        """
+        renderer = getattr(Kennelish, entry["input"])
+        if not entry.get("prefill", True):
+            return renderer(entry, None)
+
+        key = entry.get("key", "")
+        if entry["input"] == "radio":
+            options = entry["options"]
+        elif entry["input"] == "slider":
+            options = range(1, 6)
+        else:
+            options = ["_default", *entry.get("options")]
+
+        try:
+            variants = {option: renderer(entry, {key: option}) for option in options}
+        except TypeError:
+            variants = {}
+        if len(variants) != len(options):
+            # Unhashable or repeated options; render this entry per request.
+            return DynamicSegment(renderer, entry)
+        # A value matching no option (e.g. an outdated answer).
+        default = renderer(entry, {key: object()})
+
+        inp_type = entry["input"]
+
+        def pick(user_data):
+            return Kennelish.prefill_value(inp_type, key, user_data)
+
+        return ChoiceSegment(variants, default, pick)
+
+    def prefill_fields(obj):
+        """
+        Lists (key, input type) of every entry that is prefilled from user
+        data, in form order.
+        """
+        fields = []
+        for entry in obj:
+            try:
+                if entry["input"] in ("h1", "h2", "h3", "p"):
+                    fields += Kennelish.prefill_fields(entry.get("elements", []))
+                elif (
+                    entry["input"] in PREFILLED_INPUTS
+                    and entry.get("prefill", True)
+                    and entry.get("key")
+                ):
+                    fields.append((entry["key"], entry["input"]))
+            except Exception:
+                # Rendered as invalid; nothing to prefill.
+                continue
+        return fields
+
+    def prefill_value(inp_type, key, user_data):
+        """
+        The value an entry is prefilled (or preselected) with, by the same
+        rules the renderers above apply.
+        """
+        if inp_type in ("email", "nid", "text"):
+            # Special rule for email discovery
+            if key == "email":
+                if user_data.get("email"):
+                    prefill = user_data.get("email")
+                else:
+                    prefill = user_data.get("discord").get("email")
+            else:
+                prefill = user_data.get(key, "")
+            return "" if prefill is None else prefill
+
+        if inp_type == "radio":
+            prefill = user_data.get(key, "")
+            if str(prefill) == "True":
+                prefill = "Yes"
+            elif str(prefill) == "False":
+                prefill = "No"
+            return prefill
+
+        if inp_type == "dropdown":
+            prefill = user_data.get(key, "_default")
+            return "_default" if prefill == "" else prefill
+
+        return user_data.get(key, "")
+
+
+# Inputs whose value comes from user data (checkboxes are never prefilled).
+PREFILLED_INPUTS = ("email", "nid", "text", "radio", "dropdown", "slider")
+
+# Stands in for user data while compiling; never appears in form content.
+SLOT = "\x00kennelish-slot\x00"
+
+
+class SlotSegment:
+    """
+    Static chunks with per-user values (from `fill`) between them.
+    """
+
+    def __init__(self, chunks, fill):
+        self.chunks = chunks
+        self.fill = fill
+
+    def render(self, user_data):
+        values = self.fill(user_data)
+        output = [self.chunks[0]]
+        for value, chunk in zip(values, self.chunks[1:]):
+            output.append(value)
+            output.append(chunk)
+        return "".join(output)
+
+
+class ChoiceSegment:
+    """
+    Pre-rendered HTML for each selectable option, picked per user.
+    """
+
+    def __init__(self, variants, default, pick):
+        self.variants = variants
+        self.default = default
+        self.pick = pick
+
+    def render(self, user_data):
+        prefill = self.pick(user_data)
+        try:
+            return self.variants.get(prefill, self.default)
+        except TypeError:
+            # Unhashable values can't match any (hashable) option.
+            return self.default
+
+
+class DynamicSegment:
+    """
+    An entry rendered per request by its Kennelish renderer.
+    """
+
+    def __init__(self, renderer, entry, *args):
+        self.renderer = renderer
+        self.entry = entry
+        self.args = args
+
+    def render(self, user_data):
+        return self.renderer(self.entry, user_data, *self.args)
+
+
+class RenderPlan:
+    """
+    A compiled Kennelish form (see Kennelish.compile). Rendering only fills in
+    the per-user parts and joins the chunks.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    def render(self, user_data=None):
+        output = []
+        for segment in self.segments:
+            if type(segment) is str:
+                output.append(segment)
+                continue
+            try:
+                output.append(segment.render(user_data))
+            except Exception as e:
+                logger.exception(e)
+                output.append(Kennelish.invalid({"input": "Malformed object"}))
+        return "".join(output)
+
 
 class Transformer:
     """
@@ -1,14 +1,133 @@
+import asyncio
 import json
 import logging
-import uuid
-from typing import List
+import time
 
 import requests
-from sqlalchemy.orm import selectinload
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.models.plinko import WaitlistCounterModel
 from app.models.user import DiscordModel, UserModel
-from app.util.database import Session, get_user
-from app.util.settings import Settings
+from app.util.settings import settings_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Serializes admissions within a worker so they queue here instead of
+# contending for the database lock (and sharing a StaticPool connection).
+admission_lock = asyncio.Lock()
+
+
+# What teammates get to see about each other.
+TEAMMATE_FIELDS = ("first_name", "discord_id", "discord_username")
+
+
+class RosterCache:
+    """
+    Per-worker cache of confirmed team rosters, keyed by assigned_run, holding
+    {team_number: [member, ...]}. Runs are matched case-insensitively, so
+    every method takes a run as stored or as typed and builds the key itself.
+
+    Rosters only change when an admin edits a user, on check-in, on
+    drop-out or when someone joins, and those paths invalidate (or patch) the
+    affected run. Entries also expire after `ttl` seconds so that writes
+    handled by another worker become visible.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self.rosters = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(run: str) -> str:
+        return run.lower() if run else run
+
+    def peek(self, run: str):
+        """
+        Returns the cached roster for a run, or None without loading it.
+        Counts the hit or miss either way.
+        """
+        cached = self.rosters.get(self.key(run))
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        return None
+
+    async def get(self, session: AsyncSession, run: str) -> dict:
+        roster = self.peek(run)
+        if roster is not None:
+            return roster
+
+        roster = await self.load(session, run)
+        self.rosters[self.key(run)] = (time.monotonic() + self.ttl, roster)
+        return roster
+
+    @staticmethod
+    async def load(session: AsyncSession, run: str) -> dict:
+        statement = (
+            select(
+                UserModel.team_number,
+                UserModel.first_name,
+                UserModel.discord_id,
+                UserModel.checked_in,
+                DiscordModel.username,
+            )
+            .outerjoin(DiscordModel, DiscordModel.user_id == UserModel.id)
+            .where(
+                UserModel.assigned_run == RosterCache.key(run),
+                UserModel.team_number.is_not(None),
+                UserModel.waitlist == 1,
+            )
+        )
+        roster = {}
+        for team_number, first_name, discord_id, checked_in, username in (
+            await session.exec(statement)
+        ).all():
+            roster.setdefault(team_number, []).append(
+                {
+                    "first_name": first_name,
+                    "discord_id": discord_id,
+                    "discord_username": username,
+                    "checked_in": checked_in,
+                }
+            )
+        return roster
+
+    def invalidate(self, *runs):
+        """
+        Drops the given runs (falsy ones are ignored).
+        """
+        for run in runs:
+            if run and self.rosters.pop(self.key(run), None) is not None:
+                self.invalidations += 1
+
+    def patch_member(self, run, team_number, discord_id, **fields):
+        """
+        Updates one cached member in place, e.g. on check-in.
+        """
+        cached = self.rosters.get(self.key(run))
+        if not cached:
+            return
+        for member in cached[1].get(team_number, []):
+            if member["discord_id"] == discord_id:
+                member.update(fields)
+
+    def snapshot(self):
+        return {
+            "runs": len(self.rosters),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+roster_cache = RosterCache()
 
 
 class Plinko:
@@ -34,56 +153,73 @@ class Plinko:
         return True, data
 
     @staticmethod
-    def get_team(session: Session, user_id):
+    async def team_for(session: AsyncSession, team_number, run):
         """
-        Get team information for a given user, including team-mates
+        Get team information for a team number and run, served from the roster cache.
         """
+        if not team_number or not run:
+            return None
 
-        # Database connection to get user...
-
-        user_data: UserModel = get_user(session, uuid.UUID(user_id))
+        roster = await roster_cache.get(session, run)
+        teammates = [
+            {key: member[key] for key in TEAMMATE_FIELDS}
+            for member in roster.get(team_number, [])
+        ]
 
-        user_team_number = user_data.team_number
-        user_run = user_data.assigned_run
+        return {"number": team_number, "run": run, "members": teammates}
 
-        if not user_team_number or not user_run:
-            return None
+    @staticmethod
+    async def get_bot_teams(session: AsyncSession, run: str):
+        """
+        Teams for a run in the format PlinkoBot expects: a list indexed by
+        team number - 1, each holding the team's Discord IDs.
+        """
+        output = []
 
-        teammates = []
+        roster = roster_cache.peek(run)
+        if roster is not None:
+            for team_number in sorted(roster):
+                if team_number > 0:
+                    output.extend([] for _ in range(team_number - len(output)))
+                    output[team_number - 1] = [
+                        member["discord_id"] for member in roster[team_number]
+                    ]
+            return output
 
-        all_users_with_team_number: List[UserModel] = (
-            session.query(UserModel)
-            .filter(UserModel.team_number == user_team_number)
-            .options(selectinload(UserModel.discord))
-            .all()
+        # Only the two columns PlinkoBot needs, already grouped by team, so
+        # rows can be streamed straight into the nested lists.
+        statement = (
+            select(UserModel.team_number, UserModel.discord_id)
+            .where(
+                UserModel.assigned_run == RosterCache.key(run),
+                UserModel.team_number > 0,
+                UserModel.waitlist == 1,
+            )
+            .order_by(UserModel.team_number)
         )
+        async for team_number, discord_id in await session.stream(statement):
+            output.extend([] for _ in range(team_number - len(output)))
+            output[team_number - 1].append(discord_id)
 
-        for user in all_users_with_team_number:
-            if user.assigned_run == user_run and user.waitlist == 1:
-                user_lite = {
-                    "first_name": user.first_name,
-                    "discord_id": user.discord_id,
-                    "discord_username": user.discord.username,
-                }
-                teammates.append(user_lite)
-
-        return {"number": user_team_number, "run": user_run, "members": teammates}
+        return output
 
     @staticmethod
-    def get_waitlist_status(session: Session, plus_one=False):
+    async def get_waitlist_status(session: AsyncSession, plus_one=False):
         """
         Return waitlist metadata as (current_count, status, group #)
         """
-        participation_cap = Settings().waitlist.participation_cap
-        waitlist_groups = Settings().waitlist.waitlist_groups  # 150, 180, 210, etc.
-        hard_cap = Settings().waitlist.hard_cap
+        participation_cap = settings_snapshot.waitlist.participation_cap
+        waitlist_groups = (
+            settings_snapshot.waitlist.waitlist_groups
+        )  # 150, 180, 210, etc.
+        hard_cap = settings_snapshot.waitlist.hard_cap
 
-        data = session.query(UserModel).filter(UserModel.waitlist > 0).all()
-        current_count = len(data)
-        currently_registered = 0
-        for user in data:
-            if user.waitlist == 1:
-                currently_registered += 1
+        # Counted in SQL; only the two totals cross the wire.
+        statement = select(
+            func.count(),
+            func.coalesce(func.sum(case((UserModel.waitlist == 1, 1), else_=0)), 0),
+        ).where(UserModel.waitlist > 0)
+        current_count, currently_registered = (await session.exec(statement)).one()
 
         if plus_one:
             current_count += 1
@@ -98,8 +234,71 @@ class Plinko:
         if capped:
             status = "Closed"
             group = 0
-        elif group == 1 or currently_registered <= participation_cap:
+        elif group == 1 or currently_registered < participation_cap:
             status = "Open"
             group = 1
 
         return current_count, status, group
+
+    @staticmethod
+    async def lock_waitlist(session: AsyncSession):
+        """
+        Takes the waitlist counter row lock for the rest of the transaction.
+        """
+        statement = (
+            update(WaitlistCounterModel)
+            .where(WaitlistCounterModel.id == 1)
+            .values(admissions=WaitlistCounterModel.admissions + 1)
+        )
+        result = await session.exec(statement)
+        if result.rowcount:
+            return
+
+        # Databases created with create_all() have no counter row yet.
+        try:
+            session.add(WaitlistCounterModel(id=1, admissions=1))
+            await session.flush()
+        except IntegrityError:
+            # Another worker seeded it first; queue behind its lock instead.
+            await session.rollback()
+            await session.exec(statement)
+
+    @staticmethod
+    async def admit(session: AsyncSession, user_data: UserModel):
+        """
+        Places a user on the roster or waitlist and returns (status, group).
+
+        The status is re-read and the user's group written in one transaction
+        while holding the waitlist lock, so simultaneous joins cannot all see
+        the same count and overshoot participation_cap or hard_cap.
+        """
+        async with admission_lock:
+            await Plinko.lock_waitlist(session)
+            # Re-read under the lock in case another request (another tab)
+            # already admitted this user.
+            await session.refresh(user_data, ["waitlist"])
+            old_group = user_data.waitlist
+
+            if old_group == 1:
+                await session.commit()
+                return "Open", 1
+
+            already_counted = old_group is not None and old_group > 0
+            signups, status, group = await Plinko.get_waitlist_status(
+                session, plus_one=not already_counted
+            )
+
+            # Never move someone further back than the group they hold.
+            if status == "Closed" or (already_counted and group > old_group):
+                await session.commit()
+                if already_counted:
+                    return "Waitlisted", old_group
+                return "Closed", 0
+
+            logger.info(f"We can update -> {group}")
+            user_data.waitlist = group
+            session.add(user_data)
+            await session.commit()
+            roster_cache.invalidate(user_data.assigned_run)
+
+        return status, group
@@ -0,0 +1,33 @@
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlmodel import SQLModel
+
+from app.util.serializers import serialize
+
+
+def orjson_default(obj):
+    """
+    Encodes what orjson does not handle natively (UUIDs, datetimes and
+    dataclasses it does): SQLModel rows and other pydantic models.
+    """
+    if isinstance(obj, SQLModel):
+        return serialize(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered in one pass by orjson.
+
+    FastAPI runs jsonable_encoder over anything a handler returns before
+    handing it to the response class; handlers with large payloads should
+    return an ORJSONResponse directly to skip that walk.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
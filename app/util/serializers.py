@@ -0,0 +1,76 @@
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlmodel import SQLModel
+
+
+@lru_cache(maxsize=None)
+def get_serializer(
+    model: type, fields: Optional[Tuple[str, ...]] = None
+) -> Callable[[SQLModel], dict]:
+    """
+    Returns a compiled function that turns an instance of `model` into the same
+    dict user_to_dict() would build, without model_dump() or isinstance checks.
+
+    Loaded relationships (e.g. UserModel.discord) are serialized one level
+    deep. `fields` optionally limits the output to the named columns and
+    relationship.column names, e.g. ("id", "first_name", "discord.username").
+    Serializers are cached per (model, fields).
+    """
+    columns = list(model.model_fields)
+    relationships = {
+        name: relationship.mapper.class_
+        for name, relationship in inspect(model).relationships.items()
+        if not relationship.uselist
+    }
+
+    if fields is not None:
+        nested = {}
+        for field in fields:
+            if "." in field:
+                parent, child = field.split(".", 1)
+                nested.setdefault(parent, []).append(child)
+        columns = [name for name in columns if name in fields]
+        relationships = {
+            name: get_serializer(related, tuple(nested[name]))
+            for name, related in relationships.items()
+            if name in nested
+        }
+    else:
+        relationships = {
+            name: get_serializer(related, tuple(related.model_fields))
+            for name, related in relationships.items()
+        }
+
+    # Columns are read straight from the instance __dict__ (one dict literal);
+    # anything not loaded there falls back to attribute access.
+    lines = [
+        "def serialize(obj):",
+        "    d = obj.__dict__",
+        "    try:",
+        "        out = {",
+        *(f"            {name!r}: d[{name!r}]," for name in columns),
+        "        }",
+        "    except KeyError:",
+        "        out = {",
+        *(f"            {name!r}: obj.{name}," for name in columns),
+        "        }",
+    ]
+    for name in relationships:
+        lines += [
+            f"    if {name!r} in d:",
+            f"        related = d[{name!r}]",
+            f"        out[{name!r}] = None if related is None else ser_{name}(related)",
+        ]
+    lines.append("    return out")
+
+    namespace = {f"ser_{name}": ser for name, ser in relationships.items()}
+    exec(compile("\n".join(lines), f"<serializer {model.__name__}>", "exec"), namespace)
+    return namespace["serialize"]
+
+
+def serialize(instance: SQLModel, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    if instance is None:
+        return None
+    return get_serializer(type(instance), fields)(instance)
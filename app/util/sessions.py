@@ -0,0 +1,139 @@
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.session import SessionModel
+from app.models.user import UserModel
+from app.util.database import open_session
+from app.util.settings import settings_snapshot
+
+
+class SessionStore:
+    """
+    Server-side login sessions (jwt.server_sessions), read through a bounded
+    in-memory cache.
+
+    The cookie holds only an opaque session id; the payload the auth
+    dependencies need (id, name, pfp, sudo, issued) is rebuilt from the
+    sessions table, and the Discord OAuth token stays there. Each worker
+    caches a session for at most `ttl` seconds, which bounds how long a
+    session revoked through another worker keeps working in this one.
+    """
+
+    def __init__(self, ttl: int = 60, maxsize: int = 4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_session_id(token: str) -> bool:
+        # JWTs always contain dots; token_urlsafe() ids never do.
+        return "." not in token
+
+    async def create(
+        self,
+        session: AsyncSession,
+        user: UserModel,
+        name: Optional[str],
+        pfp: Optional[str],
+        discord_token: Optional[dict] = None,
+    ) -> str:
+        """
+        Stores a new session for `user` and returns its id.
+        """
+        issued = time.time()
+        if user.sudo:
+            lifetime = settings_snapshot.jwt.lifetime_sudo
+        else:
+            lifetime = settings_snapshot.jwt.lifetime_user
+
+        # Drop the user's expired sessions while we're here.
+        await session.exec(
+            delete(SessionModel).where(
+                SessionModel.user_id == user.id, SessionModel.expires < issued
+            )
+        )
+        session_id = secrets.token_urlsafe(24)
+        session.add(
+            SessionModel(
+                id=session_id,
+                user_id=user.id,
+                name=name,
+                pfp=pfp,
+                sudo=user.sudo,
+                discord_token=discord_token,
+                issued=issued,
+                expires=issued + lifetime,
+            )
+        )
+        await session.commit()
+        return session_id
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """
+        Returns the payload of a live session, or None if it is unknown,
+        expired or revoked.
+        """
+        now = time.time()
+        entry = self.entries.get(session_id)
+        if entry is not None:
+            cached_until, payload = entry
+            if now < cached_until:
+                self.entries.move_to_end(session_id)
+                self.hits += 1
+                return payload
+            del self.entries[session_id]
+        self.misses += 1
+
+        async with open_session() as session:
+            row = await session.get(SessionModel, session_id)
+        if row is None or row.expires <= now:
+            return None
+
+        payload = {
+            "id": str(row.user_id),
+            "name": row.name,
+            "pfp": row.pfp,
+            "sudo": row.sudo,
+            "issued": row.issued,
+        }
+        self.entries[session_id] = (min(now + self.ttl, row.expires), payload)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return payload
+
+    async def revoke(self, session: AsyncSession, session_id: str):
+        await session.exec(delete(SessionModel).where(SessionModel.id == session_id))
+        await session.commit()
+        self.entries.pop(session_id, None)
+
+    async def revoke_user(self, session: AsyncSession, user_id) -> int:
+        """
+        Revokes every session of a user, returning how many were removed.
+        """
+        result = await session.exec(
+            delete(SessionModel).where(SessionModel.user_id == user_id)
+        )
+        await session.commit()
+        for session_id, (_, payload) in list(self.entries.items()):
+            if payload["id"] == str(user_id):
+                del self.entries[session_id]
+        return result.rowcount
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+session_store = SessionStore()
@@ -1,3 +1,5 @@
+import base64
+import hashlib
 import json
 import logging
 import os
@@ -7,8 +9,9 @@ import subprocess
 from typing import Optional
 
 import yaml
-from pydantic import BaseModel, Field, SecretStr, constr, model_validator
-from pydantic_settings import BaseSettings
+from cryptography.fernet import Fernet, InvalidToken
+from pydantic import BaseModel, ConfigDict, Field, SecretStr, constr, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +19,86 @@ config_file = pathlib.Path(os.getenv("ONBOARD_CONFIG_FILE", "config.yml")).resol
 onboard_env = os.getenv("ONBOARD_ENV", "prod")
 
 if onboard_env == "dev":
-    import hashlib
     import socket
 
 
-def BitwardenConfig(settings: dict):
+def fetch_bitwarden_secrets(project_id: str) -> str:
     """
-    Takes a dict of settings loaded from yaml and adds the secrets from bitwarden to the settings dict.
-    The bitwarden secrets are mapped to the settings dict using the bitwarden_mapping dict.
-    The secrets are sourced based on a project id in the settings dict.
+    Runs `bws secret list` for a project and returns its raw JSON output.
     """
     logger.debug("Loading secrets from Bitwarden")
     try:
-        project_id = settings["bws"]["project_id"]
         if bool(re.search("[^a-z0-9-]", project_id)):
             raise ValueError("Invalid project id")
         command = ["bws", "secret", "list", project_id, "--output", "json"]
         env_vars = os.environ.copy()
-        bitwarden_raw = subprocess.run(
+        return subprocess.run(
             command, text=True, env=env_vars, capture_output=True
         ).stdout
     except Exception as e:
         logger.exception(e)
         raise e
-    bitwarden_settings = parse_json_to_dict(bitwarden_raw)
+
+
+def bitwarden_cache_key() -> Optional[bytes]:
+    """
+    Derives the secret cache's Fernet key from BWS_ACCESS_TOKEN, so the cache
+    is only readable with the credentials that could fetch the secrets anyway.
+    """
+    access_token = os.getenv("BWS_ACCESS_TOKEN")
+    if not access_token:
+        return None
+    digest = hashlib.sha256(b"onboard-bws-cache:" + access_token.encode()).digest()
+    return base64.urlsafe_b64encode(digest)
+
+
+def load_bitwarden_secrets(bws: dict, refresh: bool = False) -> dict:
+    """
+    Returns the project's Bitwarden secrets as a {key: value} dict.
+
+    Secrets are cached in an encrypted file (bws.cache_file, next to the config
+    file by default) for bws.cache_ttl seconds, so only the first worker to
+    start within that window pays for the `bws` subprocess. `refresh` skips
+    the cache and rewrites it.
+    """
+    cache_file = pathlib.Path(
+        bws.get("cache_file", config_file.with_name(".bws_cache"))
+    ).resolve()
+    ttl = bws.get("cache_ttl", 3600)
+    key = bitwarden_cache_key()
+
+    if key and not refresh and cache_file.exists():
+        try:
+            # Fernet tokens carry their creation time, which enforces the TTL.
+            cached = Fernet(key).decrypt(cache_file.read_bytes(), ttl=ttl)
+            return parse_json_to_dict(cached)
+        except InvalidToken:
+            logger.debug("Bitwarden secret cache is stale or unreadable")
+
+    bitwarden_raw = fetch_bitwarden_secrets(bws["project_id"])
+    secrets = parse_json_to_dict(bitwarden_raw)
+
+    if key:
+        try:
+            # Write-then-rename, so concurrently starting workers never read
+            # a partial file.
+            temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}")
+            fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(Fernet(key).encrypt(bitwarden_raw.encode()))
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write Bitwarden secret cache: {e}")
+    return secrets
+
+
+def BitwardenConfig(settings: dict, refresh: bool = False):
+    """
+    Takes a dict of settings loaded from yaml and adds the secrets from bitwarden to the settings dict.
+    The bitwarden secrets are mapped to the settings dict using the bitwarden_mapping dict.
+    The secrets are sourced based on a project id in the settings dict.
+    """
+    bitwarden_settings = load_bitwarden_secrets(settings["bws"], refresh=refresh)
 
     bitwarden_mapping = {
         "discord_bot_token": ("discord", "bot_token"),
@@ -92,10 +151,29 @@ def parse_json_to_dict(json_string):
 if settings.get("bws", {}).get("enable"):
     settings = BitwardenConfig(settings)
 
+
+def refresh_bitwarden_cache():
+    """
+    Re-fetches the Bitwarden secrets into the cache file, e.g. after a secret
+    was rotated. Workers pick up the new values when they next start.
+    """
+    if settings.get("bws", {}).get("enable"):
+        load_bitwarden_secrets(settings["bws"], refresh=True)
+
+
 logger.debug("Final settings: %s", settings)
 
 
-class DiscordConfig(BaseModel):
+class FrozenModel(BaseModel):
+    """
+    Base for config sections. Settings are validated once at import and are
+    read-only afterwards, so they can be bound at module level and shared.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+
+class DiscordConfig(FrozenModel):
     """
     Represents the configuration settings for Discord integration.
 
@@ -108,6 +186,10 @@ class DiscordConfig(BaseModel):
         scope (str): The scope of permissions required for the Discord integration.
         secret (SecretStr): The secret key for the Discord oauth.
         enable (Optional[bool]): A flag indicating whether Discord integration is enabled.
+        timeout (Optional[float]): Seconds before a Discord API call is given up on.
+        max_connections (Optional[int]): Connections each worker may open to the Discord API.
+        keepalive_expiry (Optional[float]): Seconds an idle Discord API connection is kept open.
+        http2 (Optional[bool]): Use HTTP/2 for the Discord API (needs httpx[http2]).
     """
 
     bot_token: Optional[SecretStr] = Field(None)
@@ -119,6 +201,10 @@ class DiscordConfig(BaseModel):
     secret: Optional[SecretStr] = Field(None)
     enable: Optional[bool] = Field(True)
     organizer_guild_id: Optional[int] = Field(None)
+    timeout: Optional[float] = Field(10.0)
+    max_connections: Optional[int] = Field(20)
+    keepalive_expiry: Optional[float] = Field(30.0)
+    http2: Optional[bool] = Field(False)
 
     @model_validator(mode="after")
     def check_required_fields(cls, values):
@@ -148,7 +234,7 @@ else:
     logger.warn("Missing discord config")
 
 
-class GoogleWalletConfig(BaseModel):
+class GoogleWalletConfig(FrozenModel):
     """
     #TODO fix docs
     """
@@ -185,7 +271,7 @@ else:
     logger.warn("Missing GWallet config")
 
 
-class WaitlistConfig(BaseModel):
+class WaitlistConfig(FrozenModel):
     participation_cap: int
     waitlist_groups: int
     hard_cap: int
@@ -194,7 +280,7 @@ class WaitlistConfig(BaseModel):
 waitlist_config = settings.get("waitlist")
 
 
-class EmailConfig(BaseModel):
+class EmailConfig(FrozenModel):
     """
     Represents the configuration for an email.
 
@@ -229,7 +315,7 @@ else:
     logger.warn("Missing email config")
 
 
-class JwtConfig(BaseModel):
+class JwtConfig(FrozenModel):
     """
     Configuration class for JWT (JSON Web Token) settings.
 
@@ -238,12 +324,15 @@ class JwtConfig(BaseModel):
         algorithm (str): The algorithm used for JWT encryption.
         lifetime_user (int): The lifetime (in seconds) of a user JWT.
         lifetime_sudo (int): The lifetime (in seconds) of a sudo JWT.
+        server_sessions (bool): Issue opaque server-side session ids instead of
+            JWTs, keeping the Discord OAuth token out of the cookie.
     """
 
     secret: SecretStr = constr(min_length=32)
     algorithm: Optional[str] = Field("HS256")
     lifetime_user: Optional[int] = Field(9072000)
     lifetime_sudo: Optional[int] = Field(86400)
+    server_sessions: Optional[bool] = Field(False)
 
 
 if settings.get("jwt"):
@@ -255,7 +344,7 @@ elif onboard_env == "dev":
     jwt_config = JwtConfig(secret=secret)
 
 
-class KeycloakConfig(BaseModel):
+class KeycloakConfig(FrozenModel):
     username: Optional[str] = Field(None)
     password: Optional[SecretStr] = Field(None)
     url: Optional[str] = Field(None)
@@ -283,7 +372,7 @@ else:
     logger.warn("Missing Keycloak Config")
 
 
-class TelemetryConfig(BaseModel):
+class TelemetryConfig(FrozenModel):
     url: Optional[str] = None
     enable: Optional[bool] = False
     env: Optional[str] = "dev"
@@ -292,7 +381,7 @@ class TelemetryConfig(BaseModel):
 telemetry_config = TelemetryConfig(**settings.get("telemetry", {}))
 
 
-class OnboardFederationConfig(BaseModel):
+class OnboardFederationConfig(FrozenModel):
     url: Optional[str] = None
     token: Optional[SecretStr] = None
     enable: Optional[bool] = False
@@ -301,8 +390,29 @@ class OnboardFederationConfig(BaseModel):
 hack_ucf_onboard = OnboardFederationConfig(**settings.get("hack_ucf_onboard", {}))
 
 
-class DatabaseConfig(BaseModel):
+class DatabaseConfig(FrozenModel):
+    """
+    Represents the database connection and pool settings.
+
+    Pool settings left unset fall back to per-backend defaults (see
+    app.util.database.POOL_DEFAULTS). Each uvicorn worker owns its own pool, so
+    the server can hold up to workers * (pool_size + max_overflow) connections.
+
+    Attributes:
+        url (str): The SQLAlchemy database URL.
+        pool_size (Optional[int]): Connections kept open per worker.
+        max_overflow (Optional[int]): Extra connections allowed under load.
+        pool_timeout (Optional[float]): Seconds to wait for a free connection.
+        pool_recycle (Optional[int]): Seconds before a connection is replaced.
+        pool_pre_ping (Optional[bool]): Test connections before handing them out.
+    """
+
     url: str
+    pool_size: Optional[int] = Field(None)
+    max_overflow: Optional[int] = Field(None)
+    pool_timeout: Optional[float] = Field(None)
+    pool_recycle: Optional[int] = Field(None)
+    pool_pre_ping: Optional[bool] = Field(None)
 
 
 if settings.get("database"):
@@ -313,7 +423,7 @@ else:
     logger.warn("Missing database config")
 
 
-class HttpConfig(BaseModel):
+class HttpConfig(FrozenModel):
     domain: str
 
 
@@ -335,6 +445,8 @@ class SingletonBaseSettingsMeta(type(BaseSettings), type):
 
 
 class Settings(BaseSettings, metaclass=SingletonBaseSettingsMeta):
+    model_config = SettingsConfigDict(frozen=True)
+
     discord: DiscordConfig = discord_config
     email: EmailConfig = email_config
     jwt: JwtConfig = jwt_config
@@ -346,3 +458,8 @@ class Settings(BaseSettings, metaclass=SingletonBaseSettingsMeta):
     telemetry: Optional[TelemetryConfig] = telemetry_config
     hack_ucf_onboard: OnboardFederationConfig = hack_ucf_onboard
     env: Optional[str] = onboard_env
+
+
+# The validated, immutable config. Hot paths import this once instead of
+# going through the Settings() singleton lookup on every use.
+settings_snapshot = Settings()
@@ -0,0 +1,20 @@
+from app.util.kennelish import Kennelish
+
+
+def bench_parse(benchmark, form, user_data):
+    name, body = form
+    benchmark.group = f"render {name}"
+    benchmark(Kennelish.parse, body, user_data)
+
+
+def bench_compile(benchmark, form):
+    name, body = form
+    benchmark.group = f"render {name}"
+    benchmark(Kennelish.compile, body)
+
+
+def bench_render_plan(benchmark, form, user_data):
+    name, body = form
+    benchmark.group = f"render {name}"
+    plan = Kennelish.compile(body)
+    benchmark(plan.render, user_data)
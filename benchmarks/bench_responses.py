@@ -0,0 +1,28 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.util.responses import ORJSONResponse
+from app.util.serializers import serialize
+
+
+def bench_json_response(benchmark, users):
+    """
+    What FastAPI does with a returned dict by default.
+    """
+    benchmark.group = "render user list"
+    content = {"data": [serialize(user) for user in users]}
+    benchmark(lambda: JSONResponse(jsonable_encoder(content)).body)
+
+
+def bench_orjson_response(benchmark, users):
+    benchmark.group = "render user list"
+    content = {"data": [serialize(user) for user in users]}
+    benchmark(lambda: ORJSONResponse(content).body)
+
+
+def bench_orjson_response_models(benchmark, users):
+    """
+    Rows handed to ORJSONResponse as-is, serialized through orjson_default.
+    """
+    benchmark.group = "render user list"
+    benchmark(lambda: ORJSONResponse({"data": users}).body)
@@ -0,0 +1,12 @@
+from app.models.user import user_to_dict
+from app.util.serializers import serialize
+
+
+def bench_user_to_dict(benchmark, users):
+    benchmark.group = "serialize users"
+    benchmark(lambda: [user_to_dict(user) for user in users])
+
+
+def bench_serialize(benchmark, users):
+    benchmark.group = "serialize users"
+    benchmark(lambda: [serialize(user) for user in users])
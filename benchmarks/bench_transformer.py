@@ -0,0 +1,27 @@
+from app.util.forms import apply_fuzzy_parsing, transform_dict
+from app.util.kennelish import Transformer
+
+
+def bench_kennelish_to_pydantic(benchmark, form):
+    name, body = form
+    benchmark.group = f"validate {name}"
+    benchmark(Transformer.kennelish_to_pydantic, body)
+
+
+def bench_validate(benchmark, form, submission):
+    name, body = form
+    benchmark.group = f"validate {name}"
+    model = Transformer.kennelish_to_pydantic(body)
+    benchmark(model.model_validate, submission)
+
+
+def bench_apply_fuzzy_parsing(benchmark, form, submission):
+    name, body = form
+    benchmark.group = f"validate {name}"
+    benchmark(apply_fuzzy_parsing, submission)
+
+
+def bench_transform_dict(benchmark, form, submission):
+    name, body = form
+    benchmark.group = f"validate {name}"
+    benchmark(transform_dict, apply_fuzzy_parsing(submission))
@@ -0,0 +1,143 @@
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.user import DiscordModel, UserModel
+from app.util.forms import apply_fuzzy_parsing
+
+FORMS_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "forms")
+
+# Cycled through by the synthetic forms, one of every input Kennelish renders.
+SYNTHETIC_INPUTS = ("text", "email", "nid", "radio", "dropdown", "slider", "checkbox")
+SECTION_SIZE = 50
+
+# Roughly a full season's user table.
+USERS = 10_000
+
+
+def load_form(name: str) -> list:
+    with open(os.path.join(FORMS_DIR, f"{name}.json"), "r") as f:
+        return json.load(f)
+
+
+def synthetic_form(fields: int) -> list:
+    """
+    A form with `fields` inputs split into h1 sections. Keys are nested
+    ("s3.f150") so transform_dict has work to do.
+    """
+    form = []
+    for start in range(0, fields, SECTION_SIZE):
+        elements = []
+        for i in range(start, min(start + SECTION_SIZE, fields)):
+            inp = SYNTHETIC_INPUTS[i % len(SYNTHETIC_INPUTS)]
+            entry = {
+                "label": f"Field {i}",
+                "caption": f"Caption for field {i}.",
+                "input": inp,
+                "key": f"s{start // SECTION_SIZE}.f{i}",
+                "required": i % 2 == 0,
+            }
+            if inp in ("radio", "dropdown", "checkbox"):
+                entry["options"] = ["Yes", "No", "Maybe"]
+            elements.append(entry)
+        form.append({"label": f"Section {start}", "input": "h1", "elements": elements})
+    form.append({"input": "navigation", "next": "/profile/", "prev": "/"})
+    return form
+
+
+def sample_value(entry: dict, i: int):
+    inp = entry["input"]
+    if inp in ("radio", "dropdown") and entry.get("options"):
+        return entry["options"][i % len(entry["options"])]
+    if inp == "email":
+        return f"user{i}@example.com"
+    if inp == "nid":
+        return f"ab{i % 1000000:06d}"
+    if inp == "slider":
+        return (i % 5) + 1
+    return f"value {i}"
+
+
+def walk(form: list):
+    for entry in form:
+        if entry.get("input") in ("h1", "h2", "h3", "p"):
+            yield from walk(entry.get("elements", []))
+        elif entry.get("key"):
+            yield entry
+
+
+def build_submission(form: list) -> dict:
+    """
+    The JSON form.js would POST for `form`, with every field answered.
+    """
+    return {entry["key"]: sample_value(entry, i) for i, entry in enumerate(walk(form))}
+
+
+def build_user_data(form: list) -> dict:
+    """
+    A serialized user that prefills every field of `form`.
+    """
+    data = {
+        key.split(".")[-1]: value
+        for key, value in apply_fuzzy_parsing(build_submission(form)).items()
+    }
+    data["discord"] = {"email": "discord@example.com"}
+    return data
+
+
+FORMS = {
+    "2": load_form("2"),
+    "edit": load_form("edit"),
+    "synthetic_500": synthetic_form(500),
+    "synthetic_5000": synthetic_form(5000),
+}
+
+
+@pytest.fixture(params=list(FORMS))
+def form(request):
+    return request.param, FORMS[request.param]
+
+
+@pytest.fixture
+def submission(form):
+    return build_submission(form[1])
+
+
+@pytest.fixture
+def user_data(form):
+    return build_user_data(form[1])
+
+
+@pytest.fixture(scope="session")
+def users():
+    """
+    USERS users with their Discord rows loaded, as /admin/list returns them.
+    """
+    users = []
+    for i in range(USERS):
+        user = UserModel(
+            id=uuid.uuid4(),
+            discord_id=str(100000000000000000 + i),
+            first_name=f"first{i}",
+            last_name=f"last{i}",
+            email=f"user{i}@example.com",
+            shirt_size="M",
+            did_agree_to_do_kh=True,
+            experience=(i % 5) + 1,
+            waitlist=(i % 4) or None,
+            team_number=(i % 50) + 1,
+            assigned_run=("saturday", "sunday")[i % 2],
+        )
+        # As selectinload leaves it: loaded, without the back-reference.
+        set_committed_value(
+            user,
+            "discord",
+            DiscordModel(
+                id=i, username=f"user{i}", email=f"discord{i}@example.com", avatar="a"
+            ),
+        )
+        users.append(user)
+    return users
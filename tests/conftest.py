@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read once, at import, so point them at a throwaway config and
+# file-backed database before anything under app/ is imported.
+test_dir = tempfile.mkdtemp(prefix="onboard-tests-")
+config_file = os.path.join(test_dir, "config.yml")
+with open(config_file, "w") as f:
+    f.write(
+        f"""
+database:
+  url: "sqlite:///{test_dir}/onboard.db"
+waitlist:
+  participation_cap: 20
+  waitlist_groups: 5
+  hard_cap: 40
+"""
+    )
+os.environ["ONBOARD_ENV"] = "dev"
+os.environ["ONBOARD_CONFIG_FILE"] = config_file
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(anyio_backend):
+    """
+    The app's engine over freshly created, empty tables.
+    """
+    from sqlmodel import SQLModel
+
+    from app.util.database import engine
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    # Connections belong to this test's event loop.
+    await engine.dispose()
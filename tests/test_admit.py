@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.models.user import UserModel
+from app.util.database import open_session
+from app.util.plinko import Plinko
+from app.util.settings import settings_snapshot
+
+WORKERS = 4
+APPLICANTS = 60
+
+
+async def admit_all(discord_ids: list) -> list:
+    async def admit(discord_id):
+        async with open_session() as session:
+            statement = select(UserModel).where(UserModel.discord_id == discord_id)
+            user = (await session.exec(statement)).one()
+            return await Plinko.admit(session, user)
+
+    return await asyncio.gather(*(admit(discord_id) for discord_id in discord_ids))
+
+
+def worker(discord_ids: list) -> list:
+    """
+    One uvicorn worker's share of the signups: its own process, engine and
+    event loop, admitting all of them at once.
+    """
+    return asyncio.run(admit_all(discord_ids))
+
+
+@pytest.mark.anyio
+async def test_concurrent_admissions_respect_caps(engine):
+    waitlist = settings_snapshot.waitlist
+    assert APPLICANTS > waitlist.hard_cap
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(UserModel),
+            [
+                {"discord_id": str(i), "did_agree_to_do_kh": True}
+                for i in range(APPLICANTS)
+            ],
+        )
+
+    shares = [
+        [str(i) for i in range(worker_id, APPLICANTS, WORKERS)]
+        for worker_id in range(WORKERS)
+    ]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(WORKERS, mp_context=context) as pool:
+        results = [
+            result
+            for share in await asyncio.gather(
+                *(
+                    asyncio.get_running_loop().run_in_executor(pool, worker, share)
+                    for share in shares
+                )
+            )
+            for result in share
+        ]
+
+    async with open_session() as session:
+        groups = Counter((await session.exec(select(UserModel.waitlist))).all())
+
+    # Nobody past the hard cap got in, and everyone up to it did.
+    admitted = sum(count for group, count in groups.items() if group)
+    assert admitted == waitlist.hard_cap
+    assert groups[None] == APPLICANTS - waitlist.hard_cap
+
+    # The roster is full, and no waitlist group overflows.
+    assert groups[1] == waitlist.participation_cap
+    for group, count in groups.items():
+        if group and group > 1:
+            assert count <= waitlist.waitlist_groups
+
+    # What admit() returned matches what was stored.
+    statuses = Counter(status for status, _ in results)
+    assert statuses["Open"] == waitlist.participation_cap
+    assert statuses["Closed"] == APPLICANTS - waitlist.hard_cap
+    assert Counter(group for _, group in results if group) == {
+        group: count for group, count in groups.items() if group
+    }
@@ -0,0 +1,90 @@
+import uuid
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.models.user import UserModel
+from app.util.database import get_user_discord, open_session
+from app.util.plinko import Plinko, RosterCache
+
+ROWS = 50_000
+ROSTER_INDEXES = ("ix_usermodel_run_team_waitlist", "ix_usermodel_waitlist")
+
+
+async def seed(engine):
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "discord_id": str(i),
+            "first_name": f"first{i}",
+            "assigned_run": ("saturday", "sunday")[i % 2],
+            "team_number": (i % 500) + 1 if i % 3 else None,
+            "waitlist": (None, 1, 2, 0)[i % 4],
+        }
+        for i in range(ROWS)
+    ]
+    async with engine.begin() as connection:
+        await connection.execute(insert(UserModel), rows)
+        await connection.exec_driver_sql("ANALYZE")
+
+
+async def query_plans(engine, query) -> list:
+    """
+    Runs `query(session)` and returns the EXPLAIN QUERY PLAN of every SELECT
+    it issued, one string per statement.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with open_session() as session:
+            await query(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans.append(" | ".join(row[-1] for row in rows))
+    assert plans, "query issued no SELECT"
+    return plans
+
+
+def assert_searches(plan: str, indexes: tuple):
+    assert "SCAN usermodel" not in plan, plan
+    assert any(f"INDEX {index} " in plan for index in indexes), plan
+
+
+@pytest.mark.anyio
+async def test_hot_queries_use_indexes(engine):
+    await seed(engine)
+
+    # SQLite picks between the two by selectivity; either beats a SCAN.
+    [roster] = await query_plans(
+        engine, lambda session: RosterCache.load(session, "saturday")
+    )
+    assert_searches(roster, ROSTER_INDEXES)
+
+    [bot] = await query_plans(
+        engine, lambda session: Plinko.get_bot_teams(session, "saturday")
+    )
+    assert_searches(bot, ROSTER_INDEXES)
+
+    [waitlist] = await query_plans(
+        engine, lambda session: Plinko.get_waitlist_status(session)
+    )
+    assert_searches(waitlist, ("ix_usermodel_waitlist",))
+
+    login = await query_plans(
+        engine,
+        lambda session: get_user_discord(session, "4242", use_selectinload=True),
+    )
+    assert_searches(login[0], ("ix_usermodel_discord_id",))
+    assert_searches(login[1], ("ix_discordmodel_user_id",))